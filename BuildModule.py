@@ -0,0 +1,354 @@
+# build-time functions that parse the ontologies into the gzipped json files of the data folder
+# they are only used by the parser notebooks and are kept out of ParsingModule, so the app does not import them
+# get_obo_subclasses expects a pronto.Ontology, which the notebooks load themselves
+from collections import defaultdict
+from xml.etree import ElementTree
+import os
+import re
+import json
+import gzip
+
+
+def help():
+    """This module contains all functions necessary to parse the ontologies into the data folder of the SDRF GUI"""
+    print("This module contains all functions necessary to parse the ontologies into the data folder of the SDRF GUI")
+    print(
+        "The get_json_subclasses function returns a nested dictionary of all subclasses of a given term in a json ontology"
+    )
+    print(
+        "The get_obo_subclasses function returns a nested dictionary of all subclasses of a given term in an obo ontology"
+    )
+    print("The flatten function returns a list of all values in a nested dictionary")
+    print(
+        "The transform_nested_dict_to_tree function returns a list of dictionaries that can be used to build a tree in streamlit"
+    )
+    print(
+        "The store_as_gzipped_json function stores a dictionary/list as a gzipped json file"
+    )
+    print(
+        "The open_gzipped_json function opens a gzipped json file and returns the dictionary/list"
+    )
+
+
+def get_json_subclasses(ontology, term_id, term_label, d, nodes_dict=None, data=None):
+    """This function takes the path to the ontology file in json format, the desired term id from the root node (e.g. http://www.ebi.ac.uk/efo/EFO_0000635) and the term label (e.g. 'organism part')
+    and returns a nested dictionary of all subclasses of the given term.
+    """
+    if nodes_dict is None:  # load the json file only once
+        with open(ontology) as f:
+            data = json.load(f)
+        nodes_dict = {
+            node["id"]: node["lbl"]
+            for node in data["graphs"][0]["nodes"]
+            if all(key in node for key in ["id", "lbl"])
+        }
+
+    if term_id not in nodes_dict:
+        return f"{term_id} node not in ontology"  # node not found in ontology, return early
+
+    if term_label not in d:
+        d[term_label] = {}  # add the parent to the dictionary
+
+    for term in data["graphs"][0]["edges"]:  # iterate through the edges
+        if (term["obj"] == term_id) and (
+            term["pred"] in ["http://purl.obolibrary.org/obo/BFO_0000050", "is_a"]
+        ):
+            parent = term["sub"]
+            if parent == "http://purl.obolibrary.org/obo/MONDO_0011876":
+                continue  # skip MONDO_0011876
+            parent_label = nodes_dict.get(parent)
+            if parent_label is not None:
+                if parent_label in d:
+                    d[term_label][parent_label] = d[parent_label]
+                    del d[parent_label]
+                else:
+                    d[term_label][parent_label] = {}
+                get_json_subclasses(
+                    ontology, parent, parent_label, d[term_label], nodes_dict, data
+                )
+
+    return d
+
+
+def remove_duplicate_values(d):
+    for k, v in d.items():
+        if isinstance(v, dict):
+            remove_duplicate_values(v)
+        if k in v:
+            del v[k]
+
+    return d
+
+
+def get_obo_subclasses(onto, obo_id, obo_label, d=None, distance=1):
+    if d is None:
+        d = defaultdict(dict)
+    """This function is built on pronto.
+    It takes the path to the ontology file in obo format, the desired term id from the root node (e.g. MS:1000031) and the term label (e.g. 'instrument model') 
+    and returns a nested dictionary of all subclasses of the given term. To only get the direct subclasses, the distance is set to 1
+    """
+
+    subclasses = list(onto[obo_id].subclasses(distance=1))
+    if len(subclasses) > 1:
+        d[obo_label] = {}
+        for i in subclasses[1:]:
+            obo_id = i.id
+            obo_label = i.name
+            d[obo_label] = get_obo_subclasses(
+                onto, obo_id, obo_label, defaultdict(dict), distance=1
+            )
+    else:
+        d = {}
+
+    d = remove_duplicate_values(d)
+    return d
+
+
+def flatten(d):
+    """This function takes a nested dictionary and returns all unique elements in the dictionary as a list"""
+    if not isinstance(d, dict):
+        print("Input is not a dictionary")
+    items = []
+    for k, v in d.items():  # iterate through the dictionary
+        items.append(k)  # add the key to the list
+        if isinstance(
+            v, dict
+        ):  # if the value is a dictionary, call the function recursively
+            items.extend(flatten(v))
+        else:
+            items.append(v)
+    items = list(set(items))
+    return items
+
+
+def transform_nested_dict_to_tree(d, parent_label=None, parent_value=None):
+    """This function takes a nested dictionary and returns a tree like dictionary that can be used in streamlit streamlit_tree_select"""
+    if not isinstance(d, dict):
+        print("Input is not a dictionary")
+    result = []
+    for key, value in d.items():
+        label = key
+        if parent_label:
+            label = f"{parent_label} , {key}"
+        children = []
+        if value:
+            children = transform_nested_dict_to_tree(value, label, key)
+        if children:
+            result.append({"label": key, "value": label, "children": children})
+        else:
+            result.append({"label": key, "value": label})
+    return result
+
+
+def store_as_gzipped_json(data, filename):
+    """ "Given a datatype to store and the filename, this function stores the data as a gzipped json file in .\\data"""
+    path = (
+        ".\\data\\"
+        + filename
+        + ".json.gz"
+    )
+    with gzip.open(path, "wt") as f:
+        json.dump(data, f)
+    return f"Stored {filename} as gzipped json"
+
+
+def open_gzipped_json(filename):
+    """ "Given a filename, this function opens the data that was stored as a gzipped json in .\\data"""
+    path = (
+        ".\\data\\"
+        + filename
+        + ".json.gz"
+    )
+    with gzip.open(path, "rt") as f:
+        data = json.load(f)
+    return data
+
+
+# synonym scopes that name the same thing as the preferred label, broad and narrow synonyms are left out
+SYNONYM_SCOPES = ("EXACT", "RELATED")
+OBO_SYNONYM = re.compile(r'^synonym:\s+"((?:[^"\\]|\\.)*)"\s+(\w+)')
+OWL_SYNONYM_TAGS = {
+    "{http://www.geneontology.org/formats/oboInOwl#}hasExactSynonym",
+    "{http://www.geneontology.org/formats/oboInOwl#}hasRelatedSynonym",
+}
+OWL_CLASS_TAG = "{http://www.w3.org/2002/07/owl#}Class"
+OWL_LABEL_TAG = "{http://www.w3.org/2000/01/rdf-schema#}label"
+
+# common names that are not synonyms in the sources shipped with the repository (ncbitaxon.obo is too large to keep in git),
+# merged into the synonym index of their category
+CURATED_SYNONYMS = {
+    "organism": {
+        "Homo sapiens": ["human"],
+        "Mus musculus": ["mouse"],
+        "Arabidopsis thaliana": ["arabidopsis", "thale cress"],
+        "Drosophila melanogaster": ["drosophila", "drosophila melanogsaster", "fruitfly", "fruit fly"],
+        "Saccharomyces cerevisiae": ["brewer's yeast"],
+        "Caenorhabditis elegans": ["c. elegans", "worm"],
+        "Danio rerio": ["zebrafish"],
+        "Escherichia coli": ["e. coli"],
+    },
+}
+
+# ontology sources (in the ontology folder) the synonyms of a category are read from, files that are missing are skipped
+SYNONYM_SOURCES = {
+    "organism": ["ncbitaxon.obo.gz"],
+    "cell": ["cl-basic.obo"],
+    "ancestry_category": ["hancestro.owl.gz"],
+    "instrument": ["psi-ms.obo.gz"],
+    "dissociation": ["psi-ms.obo.gz"],
+    "cleavage_agent": ["psi-ms.obo.gz"],
+    "label": ["pride_cv_updated.obo.gz"],
+    "fractionation": ["pride_cv_updated.obo.gz"],
+    "reduction": ["pride_cv_updated.obo.gz"],
+    "alkylation": ["pride_cv_updated.obo.gz"],
+    "enrichment": ["efo.json"],
+    "disease": ["efo.json"],
+    "organism_part": ["efo.json"],
+    "developmental_stage": ["efo.json"],
+    "cell_line": ["efo.json"],
+}
+
+
+def _open_text(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def get_obo_synonyms(path, scopes=SYNONYM_SCOPES):
+    """This function reads an ontology in obo format (optionally gzipped) line by line and returns {term label: [synonyms]}
+    for the synonyms with one of the given scopes"""
+    synonyms = defaultdict(list)
+    label, term_synonyms = None, []
+    with _open_text(path) as f:
+        for line in f:
+            if line.startswith("["):
+                if label is not None and term_synonyms:
+                    synonyms[label].extend(term_synonyms)
+                label, term_synonyms = None, []
+            elif line.startswith("name:"):
+                label = line[len("name:"):].strip()
+            elif line.startswith("synonym:"):
+                match = OBO_SYNONYM.match(line)
+                if match and match.group(2) in scopes:
+                    term_synonyms.append(match.group(1).replace('\\"', '"'))
+    if label is not None and term_synonyms:
+        synonyms[label].extend(term_synonyms)
+    return dict(synonyms)
+
+
+def get_owl_synonyms(path):
+    """This function streams an ontology in owl (rdf/xml) format (optionally gzipped) and returns {term label: [synonyms]}
+    for the exact and related synonyms (oboInOwl:hasExactSynonym and hasRelatedSynonym)"""
+    synonyms = defaultdict(list)
+    label, term_synonyms, depth = None, [], 0
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        for event, element in ElementTree.iterparse(f, events=("start", "end")):
+            if element.tag == OWL_CLASS_TAG:
+                if event == "start":
+                    depth += 1
+                    if depth == 1:
+                        label, term_synonyms = None, []
+                    continue
+                depth -= 1
+                if depth == 0:
+                    if label and term_synonyms:
+                        synonyms[label].extend(term_synonyms)
+                    element.clear()
+            elif event == "end" and depth == 1:
+                if element.tag == OWL_LABEL_TAG and label is None and element.text:
+                    label = element.text.strip()
+                elif element.tag in OWL_SYNONYM_TAGS and element.text:
+                    term_synonyms.append(element.text.strip())
+    return dict(synonyms)
+
+
+def get_json_synonyms(path):
+    """This function reads an ontology in obographs json format (e.g. efo.json) and returns {term label: [synonyms]}
+    for the exact and related synonyms"""
+    with _open_text(path) as f:
+        data = json.load(f)
+    synonyms = defaultdict(list)
+    for node in data["graphs"][0]["nodes"]:
+        label = node.get("lbl")
+        for synonym in node.get("meta", {}).get("synonyms", []):
+            if label and synonym.get("pred") in ("hasExactSynonym", "hasRelatedSynonym"):
+                synonyms[label].append(synonym["val"])
+    return dict(synonyms)
+
+
+def get_synonyms(path):
+    """Reads the synonyms of an ontology file with the reader that fits its format"""
+    name = path[:-len(".gz")] if path.endswith(".gz") else path
+    if name.endswith(".obo"):
+        return get_obo_synonyms(path)
+    if name.endswith(".owl"):
+        return get_owl_synonyms(path)
+    if name.endswith(".json"):
+        return get_json_synonyms(path)
+    raise ValueError(f"No synonym reader for {path}")
+
+
+def build_synonym_index(synonyms, elements):
+    """This function returns a {case-folded synonym: preferred label} dictionary for the labels in elements.
+    Every label is also added case-folded, so values that only differ in case are normalised too.
+    A synonym that belongs to more than one label is left out, a label always wins from a synonym of another term."""
+    elements = set(elements)
+    candidates = defaultdict(set)
+    for label, label_synonyms in synonyms.items():
+        if label not in elements:
+            continue
+        for synonym in label_synonyms:
+            candidates[" ".join(synonym.casefold().split())].add(label)
+    index = {key: labels.pop() for key, labels in candidates.items() if len(labels) == 1}
+    for label in elements:
+        index[" ".join(label.casefold().split())] = label
+    return index
+
+
+def _elements_path(data_folder, category):
+    """Returns the path of the element list of a category in the data folder (e.g. all_fractionation_method_elements for fractionation)"""
+    from OntologyStore import category_from_key, key_from_filename
+    for filename in sorted(os.listdir(data_folder)):
+        key = key_from_filename(filename)
+        if key.startswith("all_") and key.endswith("_elements") and category_from_key(key) == category:
+            return os.path.join(data_folder, filename)
+    return None
+
+
+def store_synonym_indexes(data_folder="data", ontology_folder="ontology"):
+    """This function builds the synonym index of every category in SYNONYM_SOURCES whose element list is in the data folder
+    and stores it as <category>_synonyms.json.gz next to it. Returns the number of entries per stored category."""
+    sizes = {}
+    read = {}
+    for category, sources in SYNONYM_SOURCES.items():
+        elements_path = _elements_path(data_folder, category)
+        if elements_path is None:
+            continue
+        with gzip.open(elements_path, "rt") as f:
+            elements = json.load(f)
+        synonyms = defaultdict(list)
+        for label, names in CURATED_SYNONYMS.get(category, {}).items():
+            synonyms[label].extend(names)
+        for source in sources:
+            path = os.path.join(ontology_folder, source)
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                continue
+            if path not in read:
+                read[path] = get_synonyms(path)
+            for label, names in read[path].items():
+                synonyms[label].extend(names)
+        index = build_synonym_index(synonyms, elements)
+        # no modification time in the gzip header, so an unchanged index is stored as the same bytes (see OntologyBundle.file_sha256)
+        with gzip.GzipFile(os.path.join(data_folder, f"{category}_synonyms.json.gz"), "wb", mtime=0) as f:
+            f.write(json.dumps(index).encode("utf-8"))
+        sizes[category] = len(index)
+    return sizes
+
+
+if __name__ == "__main__":
+    # python BuildModule.py [data folder] [ontology folder]: rebuilds the synonym indexes
+    import sys
+    for category, size in store_synonym_indexes(*sys.argv[1:3]).items():
+        print(f"{category}_synonyms: {size} entries")
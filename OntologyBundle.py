@@ -0,0 +1,423 @@
+import os
+import sys
+import gzip
+import json
+import hashlib
+import mmap
+import struct
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+# file layout: header | array sections | string table | json directory
+# the header holds the magic and the offset and length of the json directory, every array section starts on an 8 byte boundary
+MAGIC = b"LSDRFOB1"
+HEADER = struct.Struct("<8sQQ")
+BUNDLE_FILENAME = "ontology.bundle"
+FORMAT_VERSION = 2
+
+
+def _label_path(parent_path, label):
+    """Returns the tree-select value of a node, which is the path of labels from the root"""
+    return label if parent_path is None else f"{parent_path} , {label}"
+
+
+class StringTable(Sequence):
+    """Strings of the bundle, decoded from the memory map on access"""
+
+    def __init__(self, buffer, offsets):
+        self._buffer = buffer
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return self._buffer[start:end].decode("utf-8")
+
+    def decode_many(self, ids):
+        """Decodes a batch of string ids at once"""
+        offsets = self._offsets
+        starts = offsets[ids].tolist()
+        ends = offsets[np.asarray(ids) + 1].tolist()
+        buffer = self._buffer
+        return [buffer[s:e].decode("utf-8") for s, e in zip(starts, ends)]
+
+
+class StringListView(Sequence):
+    """Read-only view on a list of strings (e.g. all_disease_elements) in the bundle"""
+
+    def __init__(self, strings, ids):
+        self._strings = strings
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self._strings.decode_many(self.ids[i])
+        return self._strings[int(self.ids[i])]
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def tolist(self):
+        return self._strings.decode_many(self.ids)
+
+
+class StringMapView(Mapping):
+    """Read-only view on a string to string dictionary (e.g. unimod_dict) in the bundle, keys are stored sorted"""
+
+    def __init__(self, strings, keys, values):
+        self._strings = strings
+        self._keys = keys
+        self._values = values
+
+    def _find(self, key):
+        low, high = 0, len(self._keys)
+        while low < high:
+            middle = (low + high) // 2
+            if self._strings[int(self._keys[middle])] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self._keys) and self._strings[int(self._keys[low])] == key:
+            return low
+        return None
+
+    def __getitem__(self, key):
+        index = self._find(key)
+        if index is None:
+            raise KeyError(key)
+        return self._strings[int(self._values[index])]
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def __iter__(self):
+        return iter(self._strings.decode_many(self._keys))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def to_dict(self):
+        return dict(zip(self._strings.decode_many(self._keys), self._strings.decode_many(self._values)))
+
+
+class TreeView:
+    """Read-only view on an ontology tree (e.g. disease_dict) in the bundle.
+    Every node has a label id and a parent, the children of node i are children[child_offsets[i]:child_offsets[i + 1]]
+    """
+
+    def __init__(self, strings, labels, parents, child_offsets, children, roots):
+        self._strings = strings
+        self.labels = labels
+        self.parents = parents
+        self.child_offsets = child_offsets
+        self.children_ids = children
+        self.roots = roots
+
+    def __len__(self):
+        return len(self.labels)
+
+    def label(self, node):
+        return self._strings[int(self.labels[node])]
+
+    def parent(self, node):
+        parent = int(self.parents[node])
+        return None if parent < 0 else parent
+
+    def children(self, node=None):
+        """Returns the ids of the children of a node, or the root nodes if no node is given"""
+        if node is None:
+            return self.roots
+        return self.children_ids[self.child_offsets[node]:self.child_offsets[node + 1]]
+
+    def _decoded_labels(self):
+        """Decodes every distinct label once, so a label that occurs at several places in the tree is one shared string"""
+        unique, inverse = np.unique(self.labels, return_inverse=True)
+        decoded = self._strings.decode_many(unique)
+        return [decoded[i] for i in inverse.tolist()]
+
+    def to_dict(self):
+        """Returns the tree as the nested dictionary it was built from"""
+        labels = self._decoded_labels()
+        offsets = self.child_offsets.tolist()
+        children = self.children_ids.tolist()
+
+        def build(nodes):
+            return {labels[n]: build(children[offsets[n]:offsets[n + 1]]) for n in nodes}
+
+        return build(self.roots.tolist())
+
+    def to_nodes(self):
+        """Returns the tree in the node format of streamlit_tree_select"""
+        labels = self._decoded_labels()
+        offsets = self.child_offsets.tolist()
+        children = self.children_ids.tolist()
+
+        def build(nodes, parent_path):
+            result = []
+            for n in nodes:
+                path = _label_path(parent_path, labels[n])
+                node = {"label": labels[n], "value": path}
+                child_nodes = build(children[offsets[n]:offsets[n + 1]], path)
+                if child_nodes:
+                    node["children"] = child_nodes
+                result.append(node)
+            return result
+
+        return build(self.roots.tolist(), None)
+
+
+class OntologyBundle:
+    """Reader for an ontology bundle file. The file is memory mapped, so nothing is decompressed or parsed up front
+    and the pages are shared between processes through the OS page cache."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, directory_offset, directory_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an ontology bundle")
+        self.directory = json.loads(self._mmap[directory_offset:directory_offset + directory_length].decode("utf-8"))
+        if self.directory["version"] != FORMAT_VERSION:
+            raise ValueError(f"{path} has bundle format version {self.directory['version']}, expected {FORMAT_VERSION}")
+        self.strings = StringTable(self._mmap, self._array(self.directory["strings"]))
+        self.entries = self.directory["entries"]
+
+    def _array(self, spec):
+        offset, dtype, count = spec
+        return np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def keys(self):
+        return self.entries.keys()
+
+    def kind(self, key):
+        return self.entries[key]["kind"]
+
+    def source_bytes(self, key):
+        """Returns the size of the gzipped json file the entry was built from"""
+        return self.entries[key]["source_bytes"]
+
+    def source_sha256(self, key):
+        """Returns the sha256 of the gzipped json file the entry was built from"""
+        return self.entries[key]["source_sha256"]
+
+    def view(self, key):
+        """Returns a read-only view on an entry of the bundle"""
+        entry = self.entries[key]
+        arrays = {name: self._array(spec) for name, spec in entry.get("arrays", {}).items()}
+        if entry["kind"] == "list":
+            return StringListView(self.strings, arrays["ids"])
+        if entry["kind"] == "map":
+            return StringMapView(self.strings, arrays["keys"], arrays["values"])
+        if entry["kind"] in ("tree", "nodes"):
+            if "tree" in entry:  # nodes that are identical to the nodes derived from a stored tree
+                return self.view(entry["tree"])
+            return TreeView(self.strings, arrays["labels"], arrays["parents"], arrays["child_offsets"], arrays["children"], arrays["roots"])
+        raise ValueError(f"Unknown bundle entry kind {entry['kind']}")
+
+    def load(self, key):
+        """Returns an entry as the same python object as the gzipped json file it was built from"""
+        view = self.view(key)
+        kind = self.kind(key)
+        if kind == "list":
+            return view.tolist()
+        if kind == "map":
+            return view.to_dict()
+        if kind == "nodes":
+            return view.to_nodes()
+        return view.to_dict()
+
+    def close(self):
+        self._mmap.close()
+
+
+def tree_elements(d):
+    """Returns every label in a nested dictionary once, in the order they are first met walking down the tree"""
+    elements = {}
+    stack = [iter(d.items())]
+    while stack:
+        for key, value in stack[-1]:
+            elements.setdefault(key, None)
+            if value:
+                stack.append(iter(value.items()))
+            break
+        else:
+            stack.pop()
+    return list(elements)
+
+
+def file_sha256(file_path):
+    """Returns the sha256 hex digest of a file, read in blocks of 1 MB"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(2**20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _nodes_to_dict(nodes):
+    """Converts a streamlit_tree_select node list back to the nested dictionary it represents"""
+    return {node["label"]: _nodes_to_dict(node.get("children", [])) for node in nodes}
+
+
+def tree_to_nodes(d, parent_path=None):
+    """Returns a nested dictionary in the node format of streamlit_tree_select, node labels are the dictionary keys themselves"""
+    result = []
+    for key, value in d.items():
+        path = _label_path(parent_path, key)
+        node = {"label": key, "value": path}
+        children = tree_to_nodes(value, path) if value else []
+        if children:
+            node["children"] = children
+        result.append(node)
+    return result
+
+
+def _classify(data):
+    """Returns the bundle entry kind of a parsed json file, or None if it can not be stored in a bundle"""
+    if isinstance(data, list) and all(isinstance(i, str) for i in data):
+        return "list"
+    if isinstance(data, list) and all(isinstance(i, dict) and "label" in i for i in data):
+        return "nodes"
+    if isinstance(data, dict) and all(isinstance(v, dict) for v in data.values()):
+        return "tree"
+    if isinstance(data, dict) and all(isinstance(k, str) and isinstance(v, str) for k, v in data.items()):
+        return "map"
+    return None
+
+
+class _BundleWriter:
+    def __init__(self):
+        self.string_ids = {}
+        self.strings = []
+        self.arrays = []
+        self.offset = HEADER.size
+
+    def string_id(self, s):
+        if s not in self.string_ids:
+            self.string_ids[s] = len(self.strings)
+            self.strings.append(s)
+        return self.string_ids[s]
+
+    def add_array(self, values, dtype):
+        array = np.asarray(values, dtype=dtype)
+        self.offset += -self.offset % 8
+        spec = [self.offset, array.dtype.str, int(array.size)]
+        self.arrays.append((self.offset, array.tobytes()))
+        self.offset += array.nbytes
+        return spec
+
+    def add_tree(self, d):
+        labels, parents, children_lists, roots = [], [], [], []
+
+        def visit(tree, parent):
+            for label, subtree in tree.items():
+                node = len(labels)
+                labels.append(self.string_id(label))
+                parents.append(parent)
+                children_lists.append([])
+                if parent < 0:
+                    roots.append(node)
+                else:
+                    children_lists[parent].append(node)
+                visit(subtree if isinstance(subtree, dict) else {}, node)
+
+        visit(d, -1)
+        child_offsets = np.cumsum([0] + [len(c) for c in children_lists])
+        children = [c for child_list in children_lists for c in child_list]
+        return {
+            "labels": self.add_array(labels, "<u4"),
+            "parents": self.add_array(parents, "<i4"),
+            "child_offsets": self.add_array(child_offsets, "<u4"),
+            "children": self.add_array(children, "<u4"),
+            "roots": self.add_array(roots, "<u4"),
+        }
+
+
+def build_bundle(folder_path, bundle_path=None):
+    """Packs all gzipped json files of the data folder into one memory mappable bundle file.
+    Lists are stored as string ids, dictionaries of dictionaries as trees with parent and child offset arrays and
+    string dictionaries as sorted key and value ids. A *_nodes file that can be derived from its *_dict tree is only stored as a reference to that tree.
+    """
+    if bundle_path is None:
+        bundle_path = os.path.join(folder_path, BUNDLE_FILENAME)
+    writer = _BundleWriter()
+    parsed = {}
+    for filename in sorted(os.listdir(folder_path)):
+        if not filename.endswith(".json.gz"):
+            continue
+        key = filename.replace(".json.gz", "")
+        file_path = os.path.join(folder_path, filename)
+        with gzip.open(file_path, "rb") as f:
+            data = json.loads(f.read().decode("utf-8"))
+        kind = _classify(data)
+        if kind is None:
+            print(f"Skipping {filename}: not a list, tree or string dictionary")
+            continue
+        source = {"source_bytes": os.path.getsize(file_path), "source_sha256": file_sha256(file_path)}
+        parsed[key] = (kind, data, source)
+
+    entries = {}
+    tree_keys = {}
+    for key, (kind, data, source) in parsed.items():
+        entry = dict(source, kind=kind)
+        if kind == "list":
+            entry["arrays"] = {"ids": writer.add_array([writer.string_id(s) for s in data], "<u4")}
+        elif kind == "map":
+            items = sorted(data.items())
+            entry["arrays"] = {
+                "keys": writer.add_array([writer.string_id(k) for k, _ in items], "<u4"),
+                "values": writer.add_array([writer.string_id(v) for _, v in items], "<u4"),
+            }
+        elif kind == "tree":
+            entry["arrays"] = writer.add_tree(data)
+            tree_keys[key] = data
+        entries[key] = entry
+
+    for key, (kind, data, source) in parsed.items():
+        if kind != "nodes":
+            continue
+        tree_key = key[: -len("_nodes")] + "_dict"
+        if tree_key in tree_keys and tree_to_nodes(tree_keys[tree_key]) == data:
+            entries[key]["tree"] = tree_key
+        else:
+            entries[key]["arrays"] = writer.add_tree(_nodes_to_dict(data))
+
+    encoded = [s.encode("utf-8") for s in writer.strings]
+    string_offsets = np.cumsum([0] + [len(s) for s in encoded], dtype=np.uint64)
+    blob = b"".join(encoded)
+    if len(blob) >= 2**32:
+        raise ValueError("The string table of the bundle does not fit in 32 bit offsets")
+    # the string table is placed after the arrays, its offsets are relative to the start of the memory map
+    blob_offset = writer.offset
+    writer.arrays.append((blob_offset, blob))
+    writer.offset += len(blob)
+    strings_spec = writer.add_array(string_offsets + blob_offset, "<u4")
+
+    directory = json.dumps({"version": FORMAT_VERSION, "strings": strings_spec, "entries": entries}).encode("utf-8")
+    directory_offset = writer.offset
+    with open(bundle_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, directory_offset, len(directory)))
+        position = HEADER.size
+        for offset, data in writer.arrays:
+            f.write(b"\0" * (offset - position))
+            f.write(data)
+            position = offset + len(data)
+        f.write(directory)
+    return bundle_path
+
+
+if __name__ == "__main__":
+    # python OntologyBundle.py [data folder] [bundle path]
+    data_folder = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+    output = sys.argv[2] if len(sys.argv) > 2 else None
+    print(f"Stored ontology bundle as {build_bundle(data_folder, output)}")
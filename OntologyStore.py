@@ -0,0 +1,368 @@
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import hashlib
+import logging
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from collections.abc import Mapping
+
+from OntologyBundle import OntologyBundle, BUNDLE_FILENAME, FORMAT_VERSION, file_sha256, tree_to_nodes, tree_elements
+from SearchModule import TermIndex, NgramIndex, NodeTable, ClosureIndex, CategoryIndex
+
+logger = logging.getLogger(__name__)
+
+# topics whose files do not share one common stem in the data folder
+CATEGORY_ALIASES = {
+    "fractionation_method": "fractionation",
+    "reduction_reagent": "reduction",
+    "orgpart": "organism_part",
+    "organism_part_dict": "organism_part",
+    "cleavage": "cleavage_agent",
+    "cleavage_list": "cleavage_agent",
+}
+
+# the NCBITaxon kingdoms, only searched for species on the Required columns page
+TAXONOMY_CATEGORIES = ("archaea", "bacteria", "eukaryota", "virus", "unclassified", "other_sequences")
+
+# element lists that contain terms which are not in the tree of their category (e.g. obsolete cell types),
+# these are always loaded from their own file instead of being derived from the tree
+STORED_ELEMENT_LISTS = {"all_cell_elements"}
+
+# keys that are not loaded with their category but the first time they are asked for: the synonym indexes are only used to
+# normalise uploaded metadata (see ValidationModule.normalise_values) and by the cross-ontology index
+DEFERRED_SUFFIXES = ("_synonyms",)
+
+
+def key_from_filename(filename):
+    """Returns the data_dict key of a file in the data folder, e.g. all_label_elements.json.gz -> all_label_elements"""
+    return filename.replace(".json.gz", "")
+
+
+def category_from_key(key):
+    """Returns the ontology category a data_dict key belongs to, e.g. all_disease_elements, disease_dict, disease_nodes and disease_synonyms -> disease"""
+    name = key
+    if name.startswith("all_") and name.endswith("_elements"):
+        name = name[len("all_"):-len("_elements")]
+    else:
+        name = re.sub(r"_(dict|nodes|list|synonyms)$", "", name)
+    return CATEGORY_ALIASES.get(name, name)
+
+
+def tree_key_for(key, available_keys):
+    """Returns the canonical tree (<category>_dict) a *_nodes or all_*_elements key can be derived from, or None if it has to be loaded"""
+    if key in STORED_ELEMENT_LISTS:
+        return None
+    if not (key.endswith("_nodes") or (key.startswith("all_") and key.endswith("_elements"))):
+        return None
+    tree_key = category_from_key(key) + "_dict"
+    return tree_key if tree_key in available_keys else None
+
+
+def deep_getsizeof(obj):
+    """Returns an estimate of the memory footprint in bytes of a json-like object (dicts, lists and strings)"""
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, MappingProxyType):
+            item = dict(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return size
+
+
+def freeze(value):
+    """Returns a read-only version of a parsed json file: lists become tuples and dictionaries read-only mapping proxies.
+    Tree-select nodes stay plain dictionaries inside tuples, because streamlit_tree_select serialises them to json"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        if value and isinstance(value[0], dict) and "label" in value[0]:
+            return freeze_nodes(value)
+        return tuple(value)
+    return value
+
+
+def freeze_nodes(nodes):
+    result = []
+    for node in nodes:
+        node = dict(node)
+        if "children" in node:
+            node["children"] = freeze_nodes(node["children"])
+        result.append(node)
+    return tuple(result)
+
+
+def open_gzipped_json_file(file_path):
+    """Opens a gzipped json file given its full path and returns the dictionary/list"""
+    return read_gzipped_json_file(file_path)[0]
+
+
+def read_gzipped_json_file(file_path):
+    """Opens a gzipped json file and returns the dictionary/list with a timing and size report of the decompression and parsing"""
+    start = time.perf_counter()
+    with gzip.open(file_path, "rb") as f:
+        json_bytes = f.read()
+    inflated = time.perf_counter()
+    data = json.loads(json_bytes.decode("utf-8"))
+    parsed = time.perf_counter()
+    return data, {
+        "decompress_seconds": round(inflated - start, 4),
+        "parse_seconds": round(parsed - inflated, 4),
+        "compressed_bytes": os.path.getsize(file_path),
+        "uncompressed_bytes": len(json_bytes),
+    }
+
+
+def load_files(readers, max_workers=None):
+    """Runs the given file readers ({key: function returning (data, report)}) concurrently on a thread pool.
+    gzip decompression releases the GIL, so large files are inflated in parallel.
+    Returns the data and a report per file with the same keys"""
+    data, report = {}, {}
+    if not readers:
+        return data, report
+    with ThreadPoolExecutor(max_workers=max_workers or min(8, len(readers))) as executor:
+        futures = {key: executor.submit(reader) for key, reader in readers.items()}
+        for key, future in futures.items():
+            data[key], report[key] = future.result()
+    return data, report
+
+
+class OntologyStore(Mapping):
+    """Read-only mapping over the parsed ontologies in the data folder.
+    All gzipped json files are registered at startup, but a file is only decompressed and parsed the first time a page asks for
+    a key of its category (e.g. data_dict["all_disease_elements"] loads all_disease_elements, disease_dict and disease_nodes).
+    The store is meant to be built once per process and shared by all sessions: every value it hands out is read-only
+    (tuples and mapping proxies), loading is guarded by a lock and pages must copy a value before changing it.
+    Only the canonical tree of a category (<category>_dict) is kept, the tree-select nodes and the flat element list are derived
+    from it the first time they are asked for and share its label strings. Duplicate files such as all_orgpart_elements and
+    organism_part_nodes become views on the organism_part_dict tree. The synonym indexes of a category (<category>_synonyms)
+    are only loaded when they are asked for.
+    The load time and memory footprint of every loaded category are kept and returned by report().
+    If the folder contains an ontology bundle (see OntologyBundle.py), files are read from the memory mapped bundle instead
+    of being decompressed, as long as the gzipped json file still has the sha256 it had when the bundle was built.
+    Element lists and string dictionaries are then handed out as views on the bundle, so their strings stay in the memory map
+    (shared by all processes through the OS page cache) and are only decoded when they are accessed.
+    """
+
+    def __init__(self, folder_path):
+        self.folder_path = folder_path
+        self.bundle = self._open_bundle(os.path.join(folder_path, BUNDLE_FILENAME))
+        self._paths = {}
+        self._digests = {}
+        self._categories = {}
+        for filename in sorted(os.listdir(folder_path)):
+            if not filename.endswith(".json.gz"):
+                continue
+            key = key_from_filename(filename)
+            self._paths[key] = os.path.join(folder_path, filename)
+            self._digests[key] = file_sha256(self._paths[key])
+            self._categories.setdefault(category_from_key(key), []).append(key)
+        self.version = self._version()
+        self._derived = {}
+        for key in self._paths:
+            tree_key = tree_key_for(key, self._paths)
+            if tree_key is not None:
+                self._derived[key] = tree_key
+        self._derived_values = {}
+        self._indexes = {}
+        self._data = {}
+        self._report = {}
+        self._file_report = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _open_bundle(bundle_path):
+        """Opens the bundle of the data folder, or returns None if there is none or it was built by another version of OntologyBundle.py"""
+        if not os.path.exists(bundle_path):
+            return None
+        try:
+            return OntologyBundle(bundle_path)
+        except ValueError as e:
+            logger.warning("Not using the ontology bundle: %s, rebuild it with python OntologyBundle.py", e)
+            return None
+
+    def _version(self):
+        """Returns a short hash of the registered files and their content (and of the bundle format, if a bundle is used).
+        It changes whenever an ontology file is rebuilt, so results computed with the ontologies can be cached under it"""
+        digest = hashlib.sha256()
+        for key, file_digest in sorted(self._digests.items()):
+            digest.update(f"{key}:{file_digest};".encode("utf-8"))
+        if self.bundle is not None:
+            digest.update(f"bundle:{FORMAT_VERSION}".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def __getitem__(self, key):
+        if key not in self._data:
+            if key not in self._paths:
+                raise KeyError(key)
+            with self._lock:
+                self.load_category(category_from_key(key))
+                if key in self._derived and key not in self._data:
+                    self._data[key] = self._derive(key)
+                elif key not in self._data:
+                    self._load_keys([key])
+        return self._data[key]
+
+    def _derive(self, key):
+        """Derives nodes or elements from the tree once per tree, keys derived from the same tree share the result"""
+        tree_key = self._derived[key]
+        kind = "nodes" if key.endswith("_nodes") else "elements"
+        if (tree_key, kind) not in self._derived_values:
+            tree = self[tree_key]
+            derived = freeze_nodes(tree_to_nodes(tree)) if kind == "nodes" else tuple(tree_elements(tree))
+            self._derived_values[(tree_key, kind)] = derived
+        return self._derived_values[(tree_key, kind)]
+
+    def search_index(self, key):
+        """Returns the search index (see SearchModule.TermIndex) over the terms of a key, built the first time it is asked for"""
+        return self._index(key, TermIndex)
+
+    def similarity_index(self, key):
+        """Returns the n-gram similarity index (see SearchModule.NgramIndex) over the terms of a key, built the first time it is asked for"""
+        return self._index(key, NgramIndex)
+
+    def membership_index(self, key):
+        """Returns a frozenset of the terms of a key for membership checks, built the first time it is asked for"""
+        return self._index(key, frozenset)
+
+    def closure_index(self, key):
+        """Returns the ancestor/descendant index (see SearchModule.ClosureIndex) over the tree of a key (e.g. disease_dict),
+        built the first time it is asked for"""
+        return self._index(key, ClosureIndex)
+
+    def node_table(self, key):
+        """Returns the table of the tree-select nodes of a key (see SearchModule.NodeTable, e.g. disease_nodes), built the first time
+        it is asked for. Nodes that can be derived from the tree of their category are indexed from the tree, so the node list is not built"""
+        tree_key = self._derived.get(key)
+        if tree_key is None:
+            return self._index(key, NodeTable)
+        return self._index(tree_key, NodeTable.from_tree)
+
+    def category_index(self):
+        """Returns the cross-ontology index (see SearchModule.CategoryIndex) over the element lists and synonyms of every category
+        except the NCBITaxon kingdoms, built the first time it is asked for"""
+        with self._lock:
+            if "categories" not in self._indexes:
+                categories = [category for category in self._categories if category not in TAXONOMY_CATEGORIES]
+                self.preload(categories)
+                self._load_keys([key for category in categories for key in self._categories[category] if key.endswith(DEFERRED_SUFFIXES)])
+                terms = {}
+                for category in categories:
+                    keys = [key for key in self._categories[category] if key.startswith("all_") or key.endswith("_synonyms")]
+                    if keys:
+                        terms[category] = [term for key in keys for term in self[key]]
+                self._indexes["categories"] = CategoryIndex(terms)
+        return self._indexes["categories"]
+
+    def _index(self, key, index_class):
+        if (key, index_class) not in self._indexes:
+            terms = self[key]
+            with self._lock:
+                if (key, index_class) not in self._indexes:
+                    self._indexes[(key, index_class)] = index_class(terms)
+        return self._indexes[(key, index_class)]
+
+    def __contains__(self, key):
+        return key in self._paths
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def categories(self):
+        """Returns the registered categories and the keys that belong to them"""
+        return {category: list(keys) for category, keys in self._categories.items()}
+
+    def is_loaded(self, category):
+        return category in self._report
+
+    def _in_bundle(self, key):
+        """Checks if a key can be read from the bundle, i.e. the bundle was built from the current content of its file"""
+        return self.bundle is not None and key in self.bundle and self.bundle.source_sha256(key) == self._digests[key]
+
+    def load_category(self, category):
+        """Decompresses and parses all files of a category, unless this was done before"""
+        self.preload([category])
+
+    def preload(self, categories, max_workers=None):
+        """Loads the files of several categories at once on a thread pool, skipping categories that were loaded before"""
+        with self._lock:
+            categories = [category for category in categories if category not in self._report]
+            readers = {}
+            for category in categories:
+                for key in self._categories[category]:
+                    if key not in self._derived and not key.endswith(DEFERRED_SUFFIXES):
+                        readers[key] = functools.partial(self._read, key)
+            start = time.perf_counter()
+            loaded, file_report = load_files(readers, max_workers)
+            seconds = time.perf_counter() - start
+            self._data.update(loaded)
+            self._file_report.update(file_report)
+            for category in categories:
+                keys = [key for key in self._categories[category] if key in loaded]
+                self._report[category] = {
+                    "category": category,
+                    "keys": keys,
+                    "source": "/".join(sorted({file_report[key]["source"] for key in keys})),
+                    "load_seconds": round(max([file_report[key]["load_seconds"] for key in keys], default=0), 4),
+                    "compressed_bytes": sum(file_report[key]["compressed_bytes"] for key in keys),
+                }
+            if categories:
+                logger.info("Loaded ontology categories %s in %.3f s", ", ".join(categories), seconds)
+
+    def _load_keys(self, keys, max_workers=None):
+        """Loads keys that are not loaded with their category (see DEFERRED_SUFFIXES) on a thread pool, skipping keys that were loaded before"""
+        with self._lock:
+            readers = {key: functools.partial(self._read, key) for key in keys if key not in self._data}
+            loaded, file_report = load_files(readers, max_workers)
+            self._data.update(loaded)
+            self._file_report.update(file_report)
+
+    def _read(self, key):
+        """Reads one key from the bundle or its gzipped json file and returns it frozen with its file report.
+        Lists and string dictionaries in the bundle are returned as views on the memory map, trees are built as dictionaries"""
+        start = time.perf_counter()
+        if self._in_bundle(key):
+            if self.bundle.kind(key) in ("list", "map"):
+                data = self.bundle.view(key)
+            else:
+                data = self.bundle.load(key)
+            report = {"source": "bundle", "compressed_bytes": os.path.getsize(self._paths[key])}
+        else:
+            data, report = read_gzipped_json_file(self._paths[key])
+            report["source"] = "json"
+        data = freeze(data)
+        report["load_seconds"] = round(time.perf_counter() - start, 4)
+        return data, dict(report, key=key)
+
+    def file_report(self):
+        """Returns the timing and size report of every file loaded so far"""
+        return list(self._file_report.values())
+
+    def report(self):
+        """Returns the load time and memory footprint of every category that has been loaded so far.
+        The memory footprint is only measured here, so it does not slow down the first access to a category,
+        and includes the nodes and element lists that were derived from the tree and the synonym indexes that were loaded since."""
+        report = []
+        for category, entry in self._report.items():
+            derived = [key for key in self._categories[category] if key in self._derived and key in self._data]
+            values = [self._data[key] for key in self._categories[category] if key in self._data]
+            report.append(dict(entry, derived_keys=derived, memory_bytes=deep_getsizeof(values)))
+        return report
@@ -1,455 +1,677 @@
-import pronto
-from pronto import Ontology
-from collections import defaultdict
-import json
-import gzip
-import pickle
-import streamlit as st
-import numpy as np
-import pandas as pd
-import re
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, DataReturnMode
-from streamlit_tree_select import tree_select
-import subprocess
-
-def help():
-    """This module contains all parsable functions necessary to build the SDRF GUI"""
-    print("This module contains all parsable functions necessary to build the SDRF GUI")
-    print(
-        "The get_json_subclasses function returns a nested dictionary of all subclasses of a given term in a json ontology"
-    )
-    print(
-        "The get_obo_subclasses function returns a nested dictionary of all subclasses of a given term in an obo ontology"
-    )
-    print("The flatten function returns a list of all values in a nested dictionary")
-    print(
-        "The transform_nested_dict_to_tree function returns a list of dictionaries that can be used to build a tree in streamlit"
-    )
-    print(
-        "The store_as_gzipped_json function stores a dictionary/list as a gzipped json file"
-    )
-    print(
-        "The open_gzipped_json function opens a gzipped json file and returns the dictionary/list"
-    )
-
-
-def get_json_subclasses(ontology, term_id, term_label, d, nodes_dict=None, data=None):
-    """This function takes the path to the ontology file in json format, the desired term id from the root node (e.g. http://www.ebi.ac.uk/efo/EFO_0000635) and the term label (e.g. 'organism part')
-    and returns a nested dictionary of all subclasses of the given term.
-    """
-    if nodes_dict is None:  # load the json file only once
-        with open(ontology) as f:
-            data = json.load(f)
-        nodes_dict = {
-            node["id"]: node["lbl"]
-            for node in data["graphs"][0]["nodes"]
-            if all(key in node for key in ["id", "lbl"])
-        }
-
-    if term_id not in nodes_dict:
-        return f"{term_id} node not in ontology"  # node not found in ontology, return early
-
-    if term_label not in d:
-        d[term_label] = {}  # add the parent to the dictionary
-
-    for term in data["graphs"][0]["edges"]:  # iterate through the edges
-        if (term["obj"] == term_id) and (
-            term["pred"] in ["http://purl.obolibrary.org/obo/BFO_0000050", "is_a"]
-        ):
-            parent = term["sub"]
-            if parent == "http://purl.obolibrary.org/obo/MONDO_0011876":
-                continue  # skip MONDO_0011876
-            parent_label = nodes_dict.get(parent)
-            if parent_label is not None:
-                if parent_label in d:
-                    d[term_label][parent_label] = d[parent_label]
-                    del d[parent_label]
-                else:
-                    d[term_label][parent_label] = {}
-                get_json_subclasses(
-                    ontology, parent, parent_label, d[term_label], nodes_dict, data
-                )
-
-    return d
-
-
-def remove_duplicate_values(d):
-    for k, v in d.items():
-        if isinstance(v, dict):
-            remove_duplicate_values(v)
-        if k in v:
-            del v[k]
-
-    return d
-
-
-def get_obo_subclasses(onto, obo_id, obo_label, d=None, distance=1):
-    if d is None:
-        d = defaultdict(dict)
-    """This function is built on pronto.
-    It takes the path to the ontology file in obo format, the desired term id from the root node (e.g. MS:1000031) and the term label (e.g. 'instrument model') 
-    and returns a nested dictionary of all subclasses of the given term. To only get the direct subclasses, the distance is set to 1
-    """
-
-    subclasses = list(onto[obo_id].subclasses(distance=1))
-    if len(subclasses) > 1:
-        d[obo_label] = {}
-        for i in subclasses[1:]:
-            obo_id = i.id
-            obo_label = i.name
-            d[obo_label] = get_obo_subclasses(
-                onto, obo_id, obo_label, defaultdict(dict), distance=1
-            )
-    else:
-        d = {}
-
-    d = remove_dupcliate_values(d)
-    return d
-
-
-def flatten(d):
-    """This function takes a nested dictionary and returns all unique elements in the dictionary as a list"""
-    if not isinstance(d, dict):
-        print("Input is not a dictionary")
-    items = []
-    for k, v in d.items():  # iterate through the dictionary
-        items.append(k)  # add the key to the list
-        if isinstance(
-            v, dict
-        ):  # if the value is a dictionary, call the function recursively
-            items.extend(flatten(v))
-        else:
-            items.append(v)
-    items = list(set(items))
-    return items
-
-
-def transform_nested_dict_to_tree(d, parent_label=None, parent_value=None):
-    """This function takes a nested dictionary and returns a tree like dictionary that can be used in streamlit streamlit_tree_select"""
-    if not isinstance(d, dict):
-        print("Input is not a dictionary")
-    result = []
-    for key, value in d.items():
-        label = key
-        if parent_label:
-            label = f"{parent_label} , {key}"
-        children = []
-        if value:
-            children = transform_nested_dict_to_tree(value, label, key)
-        if children:
-            result.append({"label": key, "value": label, "children": children})
-        else:
-            result.append({"label": key, "value": label})
-    return result
-
-
-def store_as_gzipped_json(data, filename):
-    """ "Given a datatype to store and the filename, this function stores the data as a gzipped json file in .\\data"""
-    path = (
-        ".\\data\\"
-        + filename
-        + ".json.gz"
-    )
-    with gzip.open(path, "wt") as f:
-        json.dump(data, f)
-    return f"Stored {filename} as gzipped json"
-
-
-def open_gzipped_json(filename):
-    """ "Given a filename, this function opens the data that was stored as a gzipped json in .\\data"""
-    path = (
-        ".\\data\\"
-        + filename
-        + ".json.gz"
-    )
-    with gzip.open(path, "rt") as f:
-        data = json.load(f)
-    return data
-
-def fill_in_from_list(df, column, values_list=None, multiple_in_one=False):
-    """provide dataframe, column and optional a list of values. 
-    reates an editable dataframe in which only that column can be modified possibly with the values from the list
-    If the list is empty, the column is freely editable
-    If the list contains only one value, the column is filled with that value
-    If the list contains more than one value, a dropdown menu is created with the values from the list
-    If multiple_in_one is True, multiple columns are created with the same dropdown menu"""
-    columns_to_adapt = [column]
-    df.fillna("empty", inplace=True)
-    cell_style = {"background-color": "#ffa478"}
-    builder = GridOptionsBuilder.from_dataframe(df)
-
-    if values_list and (len(values_list)==1): # if there is only one value, fill in the column with that value
-        df[column] = values_list[0]
-        df.replace("empty", np.nan, inplace=True)
-    elif values_list and (len(values_list)>1): # if there is a list of values, add a dropdown menu to the column
-        # add '' to the beginning of values list so it starts with an empty input
-        values_list.insert(0, "")
-        values_list.insert(1, "NA") #add NA
-        if multiple_in_one: # add columns based on number of values in values_list
-            for i in range(len(values_list)-1):
-                df[f"{column}_{i}"] = ""
-                columns_to_adapt.append(f"{column}_{i}")
-            builder.configure_columns(columns_to_adapt, editable=True, cellEditor="agSelectCellEditor", cellEditorParams={"values": values_list}, cellStyle = cell_style)
-        else: # if not multiple_in_one, just add the column
-            builder.configure_column(column,editable=True,cellEditor="agSelectCellEditor",cellEditorParams={"values": values_list}, cellStyle = cell_style)
-        builder.configure_grid_options(enableRangeSelection=True, enableFillHandle=True, suppressMovableColumns=True, singleClickEdit=True)
-        gridOptions = builder.build()
-        grid_return = AgGrid(
-            df,
-            gridOptions=gridOptions,
-            update_mode=GridUpdateMode.MANUAL,
-            data_return_mode=DataReturnMode.AS_INPUT)
-        df = grid_return["data"]
-        df.replace("empty", np.nan, inplace=True)
-              
-    elif values_list is None: # if there is no list of values, make the column editable
-        builder.configure_column(column, editable=True, cellStyle = cell_style)
-        builder.configure_grid_options(enableRangeSelection=True, enableFillHandle=True, suppressMovableColumns=True, singleClickEdit=True)
-        gridOptions = builder.build()
-        grid_return = AgGrid(
-            df,
-            gridOptions=gridOptions,
-            update_mode=GridUpdateMode.MANUAL,
-            data_return_mode=DataReturnMode.AS_INPUT)
-        df = grid_return["data"]
-        df.replace("empty", np.nan, inplace=True)
-    return df
-
-def multiple_ontology_tree(column, element_list, nodes, df, multiple_in_one = False):
-    """
-    This function asks the column name, all the elements for the drop down menu and the nodes for the tree.
-    It asks for the number of inputs and then creates the input dataframe with in-cell drop down menus with the chosen values.
-    """
-    #get index of column based on name
-    if column not in df.columns:
-        df[column] = np.nan
-    index = df.columns.get_loc(column)
-    col1, col2, col3 = st.columns(3)
-    columns_to_adapt = [column]
-    with col1:
-        multiple = st.radio(f"Are there multiple {column} in your data?", ("No", "Yes"))
-        if multiple == "Yes":
-            with col2:
-                number = st.number_input(
-                    f"How many different {column} are in your data?",
-                    min_value=0,
-                    step=1)
-            with col3:
-                if multiple_in_one:
-                    multiple_in_one_sel = st.radio(f"Are there multiple {column} within one sample?", ("No", "Yes"))     
-                    if multiple_in_one_sel == "Yes":
-                        for i in range(number-1):
-                            # add column next to the original column if it is not already there
-                            if f"{column}_{i+1}" not in df.columns:
-                                df.insert(index+1, f"{column}_{i+1}", "empty")
-                            columns_to_adapt.append(f"{column}_{i+1}")
-        else:
-            number = 1
-
-    with st.form("Select here your ontology terms using the autocomplete function or the ontology-based tree menu", clear_on_submit=True):
-        col4, col5 = st.columns(2)
-        with col4:
-            # selectbox with search option
-            element_list.append(" ")
-            element_list = set(element_list)
-            return_search = st.multiselect(
-                "Select your matching ontology term using this autocomplete function",
-                element_list,
-                max_selections=number,
-            )
-
-        with col5:
-            st.write("Or follow the ontology based drop down menu below")
-            return_select = tree_select(
-                nodes, no_cascade=True, expand_on_click=True, check_model="leaf"
-            )
-        all = return_search + return_select["checked"]
-        all = [i.split(',')[-1] for i in all if i is not None]
-        if (len(all) >= 1) & (len(all) != number):
-            st.error(f"You need to select a total of {number}.")
-        s = st.form_submit_button("Submit selection")
-        if s:
-            st.write(f"Selection contains: {all}")
- 
-    if s & (len(all) == 1) & number == 1:
-        df[column] = all[0]
-        st.experimental_rerun()
-
-    else:
-        df.fillna("empty", inplace=True)
-        st.write(f"If all cells are correctly filled in click twice on the update button")
-        cell_style = {"background-color": "#ffa478"}
-        builder = GridOptionsBuilder.from_dataframe(df)
-        builder.configure_columns(columns_to_adapt,editable=True,cellEditor="agSelectCellEditor",cellEditorParams={"values": all},cellStyle=cell_style)
-        builder.configure_grid_options(enableRangeSelection=True, enableFillHandle=True, suppressMovableColumns=True, singleClickEdit=True)
-        go = builder.build()
-        grid_return = AgGrid(df,gridOptions=go,update_mode=GridUpdateMode.MANUAL,data_return_mode=DataReturnMode.AS_INPUT)
-        df = grid_return["data"]
-    df.replace("empty", np.nan, inplace=True)   
-    return df
-
-
-def validate_sdrf(file_path):
-    """Runs SDRF validation and returns success status & messages."""
-    try:
-        result = subprocess.run(
-            ["parse_sdrf", "validate-sdrf", "--sdrf_file", file_path],
-            capture_output=True,
-            text=True,
-            check=False  # Prevent exception on failure
-        )
-        if result.returncode == 0:
-            return True, result.stdout.strip()
-        else:
-            return False, result.stdout.strip()
-    except FileNotFoundError:
-        return None, "SDRF validation tool not found. Install `sdrf-pipelines` via `pip install sdrf-pipelines`."
-
-
-
-
-# function check_df_for_ontology_terms
-# checks if the dataframe contains ontology terms
-
-def check_df_for_ontology_terms(df, columns_to_check, column_ontology_dict):
-    clear_columns = []
-    for i in columns_to_check:
-        name = (i.split('[')[-1].split(']')[0]).replace(' ', '_')
-        name = 'all_' + name + '_elements'
-        #if the column is an ontology column
-        if name in column_ontology_dict.keys():
-            onto_elements = column_ontology_dict[name]
-            elements = df[i].unique()
-            elements = [i for i in elements if i is not np.nan]
-            # check if elements are all in onto_elements
-            # if not, return the elements that are not in the ontology
-            if not set(elements).issubset(set(onto_elements)):
-                not_in_onto = set(elements) - set(onto_elements)
-                st.error(f'The following elements are not in the ontology: {not_in_onto}')
-                clear_columns.append(i)
-            elif set(elements).issubset(set(onto_elements)) and len(elements) >= 1:
-                st.success(f'The column {i} contains only ontology terms')
-        if i == 'characteristics[age]':
-            if not check_age_format(df, 'characteristics[age]'):
-                st.error(f'The age format is not correct. Please use the following format: 1Y 2M 3D')
-                clear_columns.append(i)
-        if i == 'characteristics[sex]':
-            uniques = np.unique(df[i].values())
-            accepted = ['M', 'F', 'unknown']
-            # check if uniques contain value that is not in accepted
-            if not set(uniques).issubset(set(accepted)):
-                not_in_onto = set(uniques) - set(accepted)
-                st.error(f'{not_in_onto} are not accepted in the characteristics[sex] column. Please use M, F or unknown')
-                clear_columns.append(i)
-    
-    # if there are columns that are not in the ontology, ask if the user wants to clear them
-    if len(clear_columns) >= 1:
-        st.error(f'The following columns contain elements that are not in the ontology: {clear_columns}')
-        st.write('Do you want to clear these columns?')
-        y = st.checkbox("Yes")
-        n = st.checkbox("No")
-        if y:
-            for i in clear_columns:
-                df[i] = np.nan
-                st.success(f'Column {i} has been cleared')
-
-def check_age_format(df, column):
-    """
-    Check if the data in a column in a pandas dataframe follows the age formatting of Y M D.
-    If a range, this should be formatted as e.g. 48Y-84Y.
-    Parameters:
-    df (pandas.DataFrame): The pandas dataframe to check.
-    column (str): The name of the column to check.
-
-
-    Returns:
-    tuple: (bool, list) where bool indicates if all data in the column follows the age formatting 
-           and list contains the wrong parts (if any).
-    """
-    wrong_parts = []
-    for index, row in df.iterrows():
-        if row[column] not in ["", "empty", "None", "Not available"]:
-            if not re.match(r"^(\s*\d+\s*Y)?(\s*\d+\s*M)?(\s*\d+\s*D)?(|\s*-\s*\d+\s*Y)?(|\s*-\s*\d+\s*M)?(|\s*-\s*\d+\s*D)?(/)?(|\s*\d+\s*Y)?(|\s*\d+\s*M)?(|\s*\d+\s*D)?$", str(row[column])):
-                wrong_parts.append(row[column])
-    return False if wrong_parts else True, wrong_parts
-
-def convert_df(df):
-    """This function requires a dataframe and sorts its columns as source name - characteristics - others - comment. 
-    Leading and trailing whitespaces are removed from all columns
-    It then converts the dataframe to a tsv file and downloads it
-    It also adds an comment[tool metadata] to indicate it was built with lesSDRF and ontology versioning"""
-    df["comment[tool metadata]"] = "lesSDRF v0.1.0"
-    #sort dataframe so that "source name" is the first column
-    cols = df.columns.tolist()
-    #get all elements from the list that start with "characteristic" and sort them alphabetically
-    characteristic_cols = sorted([i for i in cols if i.startswith("characteristic")])
-    #first elements in characteric_cols should always be characteristics[organism]	characteristics[organism part]
-    if "characteristics[organism]" in characteristic_cols:
-        characteristic_cols.remove("characteristics[organism]")
-        characteristic_cols.insert(0, "characteristics[organism]")
-    if "characteristics[organism part]" in characteristic_cols:
-        characteristic_cols.remove("characteristics[organism part]")
-        characteristic_cols.insert(1, "characteristics[organism part]")
-    comment_cols = sorted([i for i in cols if i.startswith("comment")])
-    factor_value_cols = sorted([i for i in cols if i.startswith("factor")])
-    #get all columns that don't start with "characteristic" or "comment"
-    other_cols = [i for i in cols if i not in characteristic_cols and i not in comment_cols and i not in factor_value_cols and i not in ["source name"]]
-    #reorder the columns, add "source name" if it is missing
-    if "source name" not in df:
-        df["source name"] = ""
-    new_cols = ["source name"] + characteristic_cols + other_cols + comment_cols + factor_value_cols
-    df = df[new_cols]
-    #if a column name contains _ followed by a number, remove the underscore and the number
-    df.columns = [re.sub(r"(_\d+)", "", i) for i in df.columns]
-    #remove leading and trailing whitespaces from all columns
-    df = df.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
-    file_path = "temp_sdrf.tsv"
-    df.to_csv(file_path, index=False, sep="\t", encoding="utf-8")
-    is_valid, message = validate_sdrf(file_path)
-
-    if is_valid is None:
-        st.error(message)
-    elif is_valid:
-        st.success("✅ SDRF validation passed!")
-    else:
-        # Filter out 'nan' errors in 'characteristics[organism]'
-        filtered_message = "\n".join(
-            line for line in message.split("\n") 
-            if '"nan"' not in line and 'characteristics[organism]' not in line
-        ).strip()
-
-        if filtered_message:  # Show warning only if there are remaining errors
-            st.warning(f"⚠️ SDRF validation failed! You can still download the file, but it may be invalid.\n\n**Details:**\n{filtered_message}")
-
-
-    return df.to_csv(index=False, sep="\t").encode("utf-8")
-
-
-def autocomplete_species_search(taxum_list, search_term):
-    col1, col2 = st.columns(2)
-    if (search_term != "") and (search_term != None):
-        # Use the filter method to dynamically filter the list of options
-        filtered_options = list(filter(lambda x: search_term.lower() in x.lower(), taxum_list))
-        exact_match = list(filter(lambda x: search_term.lower() == x.lower(), taxum_list))
-        if exact_match:
-            with col1:
-                st.write(f"An exact match was found: **{exact_match[0]}**")
-            with col2:
-                use_exact_match  = st.checkbox("Use exact match", key=f"exact_{search_term}")
-                if use_exact_match:
-                    return exact_match[0]
-        # if length is between 0 and 500, display the options
-        if len(filtered_options) > 0 and len(filtered_options) < 500:
-            with col1:
-                selected_options = st.multiselect("Some options closely matching your search time could be found", filtered_options)      
-            # Display the selected options
-            with col2:
-                if selected_options:
-                    st.write("You selected:", selected_options)
-                    use_options = st.checkbox("Use selected options", key=f"selected_{search_term}")
-                    if use_options:
-                        return selected_options
-        if len(filtered_options) > 500:
-            st.write("Too many closely related options to display (>500). Please refine your search.")
-        if len(filtered_options) == 0:
-            st.write("No options found. Please refine your search.")
\ No newline at end of file
+import streamlit as st
+import numpy as np
+import pandas as pd
+import io
+import re
+import hashlib
+import functools
+import importlib
+import ValidationModule
+
+# build-time functions live in BuildModule, they are still importable from here for the parser notebooks
+BUILD_FUNCTIONS = [
+    "help",
+    "get_json_subclasses",
+    "remove_duplicate_values",
+    "get_obo_subclasses",
+    "flatten",
+    "transform_nested_dict_to_tree",
+    "store_as_gzipped_json",
+    "open_gzipped_json",
+]
+
+
+def __getattr__(name):
+    """Imports BuildModule only when one of its functions is asked for (PEP 562)"""
+    if name in BUILD_FUNCTIONS:
+        return getattr(importlib.import_module("BuildModule"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_closure_index(category, data_dict=None):
+    """Given an ontology category (e.g. disease, organism_part), returns the ancestor/descendant index over its tree
+    (see SearchModule.ClosureIndex), built once per process by the ontology store (by default the one in the session state)"""
+    if data_dict is None:
+        data_dict = st.session_state["data_dict"]
+    return data_dict.closure_index(f"{category}_dict")
+
+def is_descendant(term, ancestor, category, data_dict=None):
+    """Checks if an ontology term lies under another term of the same category, e.g. is_descendant("liver", "anatomical entity", "organism_part")"""
+    return get_closure_index(category, data_dict).is_descendant(term, ancestor)
+
+def get_ancestors(term, category, data_dict=None):
+    """Returns the labels of all terms above an ontology term, nearest first"""
+    return get_closure_index(category, data_dict).ancestors(term)
+
+def subtree_size(term, category, data_dict=None):
+    """Returns the number of nodes under an ontology term in the tree of its category"""
+    return get_closure_index(category, data_dict).subtree_size(term)
+
+def propose_sdrf_column(values, sdrf_columns, data_dict, min_coverage=0.5):
+    """Given the values of an uploaded metadata column, proposes the SDRF column they belong to.
+    The distinct values are matched against the terms and synonyms of all ontologies at once (see SearchModule.CategoryIndex)
+    and the best covered category that belongs to one of the given SDRF columns is returned as (column, category, coverage),
+    or None if no category knows at least min_coverage of the values"""
+    from OntologyStore import category_from_key
+    column_of = {}
+    for column in sdrf_columns:
+        name = 'all_' + (column.split('[')[-1].split(']')[0]).replace(' ', '_') + '_elements'
+        if name in data_dict:
+            column_of.setdefault(category_from_key(name), column)
+    for category, coverage in data_dict.category_index().coverage(values):
+        if category in column_of:
+            if coverage < min_coverage:
+                return None
+            return column_of[category], category, coverage
+    return None
+
+# above this number of rows an SDRF is large: it is shown one page at a time and its editable grids only hold the data file
+# and the columns being edited
+LARGE_SDRF_ROWS = 500
+PREVIEW_PAGE_SIZE = 100
+
+
+def is_large_sdrf(df):
+    return df.shape[0] > LARGE_SDRF_ROWS
+
+
+def read_sdrf(file, sep="\t"):
+    """Reads an SDRF tsv file (or another delimited file) in one pass with every column as text, so no numbers or dates are inferred
+    (e.g. comment[fraction identifier] keeps 01) and no column is parsed twice to guess its type"""
+    return pd.read_csv(file, sep=sep, dtype=str)
+
+
+def read_xlsx(file):
+    """Reads the first sheet of an xlsx file with every column as text. The sheet is streamed row by row by openpyxl
+    in read-only mode instead of loading the whole workbook"""
+    import openpyxl
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, ())
+        columns = [f"Unnamed: {i}" if name is None else str(name) for i, name in enumerate(header)]
+        data = [
+            [np.nan if value is None else str(value) for value in row[:len(columns)]]
+            for row in rows if any(value is not None for value in row)
+        ]
+    finally:
+        workbook.close()
+    return pd.DataFrame(data, columns=columns, dtype=object)
+
+
+READERS = {
+    "tsv": read_sdrf,
+    "csv": functools.partial(read_sdrf, sep=","),
+    "xlsx": read_xlsx,
+}
+
+
+def read_upload(uploaded_file):
+    """Reads an uploaded tsv, csv or xlsx file (see READERS) with every column as text.
+    The parsed dataframe is memoised on the content hash of the file, so reruns and uploading the same file again do not parse it again"""
+    data = uploaded_file.getvalue()
+    extension = uploaded_file.name.split(".")[-1].lower()
+    return _read_upload(hashlib.sha256(data).hexdigest(), extension, data)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _read_upload(digest, extension, _data):
+    # the content is only passed to be read, the cache key is its hash and the file type
+    return READERS[extension](io.BytesIO(_data))
+
+
+def sdrf_preview(df, key, page_size=PREVIEW_PAGE_SIZE):
+    """Shows the SDRF dataframe. A large SDRF is shown one page of page_size rows at a time,
+    so a rerun only sends that page to the browser instead of the whole file"""
+    if not is_large_sdrf(df):
+        st.dataframe(df)
+        return
+    pages = (df.shape[0] - 1) // page_size + 1
+    page = st.number_input(f"Page of the SDRF file (of {pages})", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_preview_page")
+    start = (page - 1) * page_size
+    st.dataframe(df.iloc[start:start + page_size])
+    st.caption(f"Rows {start + 1} to {min(start + page_size, df.shape[0])} of {df.shape[0]}")
+
+
+def fill_column(df, column, value, pattern=None, source="comment[data file]"):
+    """Fills a column with a value in one vectorised assignment, in all rows or only in the rows whose source column
+    (by default the data file) matches the regular expression pattern. Returns the number of filled rows"""
+    if pattern:
+        rows = df[source].astype(str).str.contains(pattern, regex=True, na=False)
+        df.loc[rows, column] = value
+        return int(rows.sum())
+    df[column] = value
+    return df.shape[0]
+
+
+def expand_labels(df, file_labels, label_column="comment[label]", file_column="comment[data file]"):
+    """Returns a new SDRF dataframe with every row repeated once per label of its data file, the label filled in label_column.
+    file_labels maps a data file to its labels, the labels of the key ALL apply to all files.
+    Rows keep their original order and the labels of a row follow the labels of ALL, then those of its file. Rows of files without labels are left out.
+    The labels are looked up once per distinct file and the rows are repeated in one vectorised take, instead of copying
+    the rows of every file for every label"""
+    all_labels = list(file_labels.get("ALL", []))
+    codes, files = pd.factorize(df[file_column], use_na_sentinel=False)
+    labels_of = [list(dict.fromkeys(all_labels + list(file_labels.get(file, [])))) for file in files]
+    counts_of = np.array([len(labels) for labels in labels_of], dtype=np.int64)
+    # the labels of all files one after the other, starts_of is where those of a file begin
+    flat_labels = np.array([label for labels in labels_of for label in labels], dtype=object)
+    starts_of = np.cumsum(counts_of) - counts_of
+    counts = counts_of[codes]
+    positions = np.repeat(np.arange(df.shape[0]), counts)
+    # the number of the label of every new row within its original row
+    offsets = np.arange(positions.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+    expanded = df.iloc[positions].reset_index(drop=True)
+    expanded[label_column] = flat_labels[starts_of[codes[positions]] + offsets] if positions.shape[0] else []
+    return expanded
+
+
+def fill_rows_by_pattern(df, columns, values_list, key):
+    """Form to fill one of the columns at once in all rows whose data file matches a pattern, for SDRFs too large to fill cell by cell"""
+    with st.form(f"{key}_fill_by_pattern"):
+        st.write("Fill many rows at once: the value is put in all rows whose data file matches the pattern (a regular expression, empty for all rows)")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            column = st.selectbox("Column", columns, key=f"{key}_fill_column")
+        with col2:
+            if values_list:
+                value = st.selectbox("Value", [value for value in values_list if value != ""], key=f"{key}_fill_value")
+            else:
+                value = st.text_input("Value", key=f"{key}_fill_value")
+        with col3:
+            pattern = st.text_input("Data file pattern", key=f"{key}_fill_pattern")
+        if st.form_submit_button("Fill rows"):
+            try:
+                filled = fill_column(df, column, value, pattern)
+            except re.error as error:
+                st.error(f"The pattern is not a valid regular expression: {error}")
+            else:
+                st.success(f"Filled {column} in {filled} rows")
+
+
+def edit_columns_in_grid(df, columns_to_adapt, values_list=None, **column_options):
+    """Shows the dataframe in an AgGrid in which only columns_to_adapt can be edited (with column_options, e.g. a drop down cellEditor)
+    and returns the dataframe with the edited values.
+    A large SDRF (see is_large_sdrf) is edited column-scoped: only its data file and the columns to adapt are sent to the grid,
+    in pages, and the rows can be filled by data file pattern (see fill_rows_by_pattern)"""
+    from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode, DataReturnMode
+    large = is_large_sdrf(df)
+    grid_df = df
+    if large:
+        fill_rows_by_pattern(df, columns_to_adapt, values_list, key=columns_to_adapt[0])
+        context = [column for column in ["comment[data file]"] if column in df.columns and column not in columns_to_adapt]
+        grid_df = df[context + columns_to_adapt]
+    builder = GridOptionsBuilder.from_dataframe(grid_df)
+    builder.configure_columns(columns_to_adapt, editable=True, cellStyle={"background-color": "#ffa478"}, **column_options)
+    builder.configure_grid_options(enableRangeSelection=True, enableFillHandle=True, suppressMovableColumns=True, singleClickEdit=True)
+    if large:
+        builder.configure_pagination(paginationAutoPageSize=False, paginationPageSize=PREVIEW_PAGE_SIZE)
+    grid_return = AgGrid(
+        grid_df,
+        gridOptions=builder.build(),
+        update_mode=GridUpdateMode.MANUAL,
+        data_return_mode=DataReturnMode.AS_INPUT)
+    if not large:
+        return grid_return["data"]
+    edited = grid_return["data"]
+    for column in columns_to_adapt:
+        df[column] = edited[column].values
+    return df
+
+
+def fill_in_from_list(df, column, values_list=None, multiple_in_one=False):
+    """provide dataframe, column and optional a list of values. 
+    reates an editable dataframe in which only that column can be modified possibly with the values from the list
+    If the list is empty, the column is freely editable
+    If the list contains only one value, the column is filled with that value
+    If the list contains more than one value, a dropdown menu is created with the values from the list
+    If multiple_in_one is True, multiple columns are created with the same dropdown menu
+    Large SDRFs are edited column-scoped, see edit_columns_in_grid"""
+    columns_to_adapt = [column]
+    df.fillna("empty", inplace=True)
+
+    if values_list and (len(values_list)==1): # if there is only one value, fill in the column with that value
+        fill_column(df, column, values_list[0])
+        df.replace("empty", np.nan, inplace=True)
+    elif values_list and (len(values_list)>1): # if there is a list of values, add a dropdown menu to the column
+        # add '' to the beginning of values list so it starts with an empty input
+        values_list.insert(0, "")
+        values_list.insert(1, "NA") #add NA
+        if multiple_in_one: # add columns based on number of values in values_list
+            for i in range(len(values_list)-1):
+                df[f"{column}_{i}"] = ""
+                columns_to_adapt.append(f"{column}_{i}")
+        df = edit_columns_in_grid(df, columns_to_adapt, values_list, cellEditor="agSelectCellEditor", cellEditorParams={"values": values_list})
+        df.replace("empty", np.nan, inplace=True)
+              
+    elif values_list is None: # if there is no list of values, make the column editable
+        df = edit_columns_in_grid(df, columns_to_adapt)
+        df.replace("empty", np.nan, inplace=True)
+    return df
+
+def ontology_term_search(column, element_list, number, page_size=50, version=0):
+    """Search-as-you-type selector over the terms of an ontology.
+    The terms are searched on the server with a prebuilt index (see SearchModule.index_for), results are cached per query
+    and only one page of page_size matches is sent to the browser instead of the whole element list.
+    Terms selected on earlier queries or pages are kept. A new version starts an empty selector, with new widget keys.
+    Returns the selected terms"""
+    from SearchModule import index_for
+    key = f"{column}_term_search_{version}"
+    selected = st.session_state.setdefault(f"{key}_selected", [])
+    query = st.text_input("Search your matching ontology term", key=f"{key}_query")
+    result = index_for(element_list).search(query, page_size)
+    page = 1
+    if result.truncated:
+        page = st.number_input("Page of matching terms", min_value=1, step=1, key=f"{key}_page")
+        result = index_for(element_list).search(query, page * page_size)
+    matches = result.matches[(page - 1) * page_size:]
+    if query and not matches:
+        st.write("No terms found. Please refine your search.")
+    options = list(dict.fromkeys(selected + ([result.exact] if result.exact else []) + matches))
+    selected = st.multiselect(
+        "Select your matching ontology term using this autocomplete function",
+        options,
+        default=selected,
+        max_selections=number,
+        key=f"{key}_select",
+    )
+    st.session_state[f"{key}_selected"] = selected
+    return selected
+
+
+def lazy_tree_select(nodes, key):
+    """Ontology tree menu (tree_select) that only sends the roots and the children of the expanded nodes to the browser.
+    nodes is the NodeTable of the ontology store (see OntologyStore.node_table), which is built from the tree of the category
+    without materialising its node list, or a list of tree-select nodes that is indexed once per process (see SearchModule.node_table_for).
+    The children of a node are loaded when it is expanded and stay loaded, so checked nodes keep their check mark when their
+    parent is collapsed again.
+    Returns the labels of the checked nodes"""
+    from streamlit_tree_select import tree_select
+    from SearchModule import node_table_for
+    table = node_table_for(nodes)
+    state = st.session_state.get(key) or {}
+    expanded = list(state.get("expanded") or [])
+    loaded = st.session_state.setdefault(f"{key}_loaded", set())
+    loaded.update(expanded)
+    return_select = tree_select(
+        table.nodes(loaded),
+        checked=list(state.get("checked") or []),
+        expanded=expanded,
+        no_cascade=True,
+        expand_on_click=True,
+        check_model="leaf",
+        key=key,
+    )
+    return [table.label(value) for value in (return_select or {}).get("checked", []) if value.isdigit()]
+
+
+def multiple_ontology_tree(column, element_list, nodes, df, multiple_in_one = False):
+    """
+    This function asks the column name, all the elements for the drop down menu and the nodes for the tree (the NodeTable of the ontology store, see lazy_tree_select).
+    It asks for the number of inputs and then creates the input dataframe with in-cell drop down menus with the chosen values.
+    """
+    #get index of column based on name
+    if column not in df.columns:
+        df[column] = np.nan
+    index = df.columns.get_loc(column)
+    col1, col2, col3 = st.columns(3)
+    columns_to_adapt = [column]
+    with col1:
+        multiple = st.radio(f"Are there multiple {column} in your data?", ("No", "Yes"))
+        if multiple == "Yes":
+            with col2:
+                number = st.number_input(
+                    f"How many different {column} are in your data?",
+                    min_value=0,
+                    step=1)
+            with col3:
+                if multiple_in_one:
+                    multiple_in_one_sel = st.radio(f"Are there multiple {column} within one sample?", ("No", "Yes"))     
+                    if multiple_in_one_sel == "Yes":
+                        for i in range(number-1):
+                            # add column next to the original column if it is not already there
+                            if f"{column}_{i+1}" not in df.columns:
+                                df.insert(index+1, f"{column}_{i+1}", "empty")
+                            columns_to_adapt.append(f"{column}_{i+1}")
+        else:
+            number = 1
+
+    # the search and the tree get new widget keys after every submitted selection, so both start empty again
+    selection_version = st.session_state.setdefault(f"{column}_selection_version", 0)
+    col4, col5 = st.columns(2)
+    with col4:
+        # the search runs on the server, only the matches of the current query are sent to the browser
+        return_search = ontology_term_search(column, element_list, number, version=selection_version)
+
+    with col5:
+        st.write("Or follow the ontology based drop down menu below")
+        # the tree is sent one level at a time, so it is not in a form: expanding a node reruns the page to load its children
+        return_select = lazy_tree_select(nodes, key=f"{column}_tree_{selection_version}")
+        all = return_search + return_select
+        all = [i for i in all if i is not None]
+        if (len(all) >= 1) & (len(all) != number):
+            st.error(f"You need to select a total of {number}.")
+        s = st.button("Submit selection", key=f"{column}_submit")
+        if s:
+            st.write(f"Selection contains: {all}")
+            # start the next selection from an empty search and a collapsed tree
+            st.session_state.pop(f"{column}_term_search_{selection_version}_selected", None)
+            st.session_state[f"{column}_selection_version"] = selection_version + 1
+ 
+    if s & (len(all) == 1) & number == 1:
+        df[column] = all[0]
+        st.experimental_rerun()
+
+    else:
+        df.fillna("empty", inplace=True)
+        st.write(f"If all cells are correctly filled in click twice on the update button")
+        df = edit_columns_in_grid(df, columns_to_adapt, all, cellEditor="agSelectCellEditor", cellEditorParams={"values": all})
+    df.replace("empty", np.nan, inplace=True)   
+    return df
+
+
+def validate_sdrf(df, template="default", data_dict=None, engine="native"):
+    """Validates an SDRF dataframe in this process, nothing is written to disk.
+    The native engine (see ValidationModule.validate_native, run column by column by session_validator) checks the required columns of the template and the rule table
+    against the ontologies of data_dict (by default the ontology store in the session state),
+    engine="sdrf-pipelines" runs the sdrf-pipelines validator instead (see ValidationModule.validate_dataframe).
+    Returns a ValidationResult: the validation status, the messages and the issues with their row and column"""
+    if engine == "sdrf-pipelines":
+        return ValidationModule.validate_dataframe(df, template)
+    return session_validator(template, data_dict).validate(df)
+
+
+def session_validator(template="default", data_dict=None):
+    """Returns the IncrementalValidator of the session (see ValidationModule.IncrementalValidator), which only re-checks the
+    columns of the SDRF that changed since its last validation. A new one is made when the template or the ontologies change"""
+    if data_dict is None:
+        data_dict = st.session_state.get("data_dict")
+    key = (template, getattr(data_dict, "version", id(data_dict)))
+    validator = st.session_state.get("sdrf_validator")
+    if validator is None or validator[0] != key:
+        validator = (key, ValidationModule.IncrementalValidator(template, data_dict))
+        st.session_state["sdrf_validator"] = validator
+    return validator[1]
+
+
+def check_df_for_ontology_terms(df, columns_to_check=None, data_dict=None):
+    """Checks the values of the columns of an SDRF dataframe (by default all of them) against the vocabulary, ontology and format rules
+    of the rule table, with the membership indexes of the ontologies of data_dict (by default the ontology store in the session state),
+    see ValidationModule.check_terms. Returns the TermReport: column -> values that are not accepted -> their rows"""
+    if data_dict is None:
+        data_dict = st.session_state["data_dict"]
+    return ValidationModule.check_terms(df, columns_to_check, data_dict)
+
+def check_age_format(df, column):
+    """
+    Check if the data in a column in a pandas dataframe follows the age formatting of Y M D.
+    If a range, this should be formatted as e.g. 48Y-84Y.
+    The column is checked in one pass over its distinct values (see ValidationModule.check_ages).
+    Parameters:
+    df (pandas.DataFrame): The pandas dataframe to check.
+    column (str): The name of the column to check.
+
+
+    Returns:
+    AgeCheck: (is_valid, wrong_values, rows) where is_valid indicates if all data in the column follows the age formatting,
+           wrong_values contains the wrong parts (if any) and rows the index of the rows that contain them.
+    """
+    return ValidationModule.check_ages(df[column])
+
+# validation results of the exported SDRF files, shared by all sessions of the process
+VALIDATION_CACHE = ValidationModule.ValidationCache()
+
+
+TOOL_METADATA = "lesSDRF v0.1.0"
+
+
+def sdrf_column_order(columns):
+    """Returns the positions of the columns in the order source name - characteristics - others - comment - factor value,
+    with characteristics[organism] and characteristics[organism part] as first characteristics. One pass over the names"""
+    source, characteristics, others, comments, factors = [], [], [], [], []
+    for position, column in enumerate(columns):
+        if column == "source name":
+            source.append(position)
+        elif column.startswith("characteristic"):
+            characteristics.append(position)
+        elif column.startswith("comment"):
+            comments.append(position)
+        elif column.startswith("factor"):
+            factors.append(position)
+        else:
+            others.append(position)
+    by_name = lambda position: columns[position]
+    characteristics.sort(key=by_name)
+    comments.sort(key=by_name)
+    factors.sort(key=by_name)
+    #first elements in characteristics should always be characteristics[organism]	characteristics[organism part]
+    for first, column in enumerate(["characteristics[organism]", "characteristics[organism part]"]):
+        position = next((position for position in characteristics if columns[position] == column), None)
+        if position is not None:
+            characteristics.remove(position)
+            characteristics.insert(first, position)
+    return source + characteristics + others + comments + factors
+
+
+def strip_values(series):
+    """Returns the column with leading and trailing whitespaces removed from its text values. Every distinct value is stripped
+    once and the column itself is returned (not a copy) when none of its values has surrounding whitespace"""
+    if not (series.dtype == object or isinstance(series.dtype, pd.StringDtype)):
+        return series
+    stripped = {}
+    for value in pd.unique(series.dropna()):
+        if isinstance(value, str) and value != value.strip():
+            stripped[value] = value.strip()
+    if not stripped:
+        return series
+    return series.replace(stripped)
+
+
+def sort_sdrf_columns(df):
+    """This function requires a dataframe and returns a new dataframe with its columns sorted as source name - characteristics - others - comment - factor value.
+    Leading and trailing whitespaces are removed from all columns
+    It also adds an comment[tool metadata] to indicate it was built with lesSDRF and ontology versioning.
+    Columns are only copied when their values change, the dataframe itself is left as it is"""
+    columns = [column for column in df.columns if column != "comment[tool metadata]"]
+    series = [df.iloc[:, position] for position, column in enumerate(df.columns) if column != "comment[tool metadata]"]
+    columns.append("comment[tool metadata]")
+    series.append(pd.Series(TOOL_METADATA, index=df.index))
+    #add "source name" if it is missing
+    if "source name" not in columns:
+        columns.append("source name")
+        series.append(pd.Series("", index=df.index))
+    order = sdrf_column_order(columns)
+    sorted_df = pd.DataFrame({number: strip_values(series[position]) for number, position in enumerate(order)}, index=df.index, copy=False)
+    #if a column name contains _ followed by a number, remove the underscore and the number
+    sorted_df.columns = [re.sub(r"(_\d+)", "", columns[position]) for position in order]
+    return sorted_df
+
+
+def tsv_field(value):
+    """Returns the text of one cell as df.to_csv(sep="\t") writes it: empty for missing values, quoted when it holds a tab,
+    a quote or a line break"""
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return ""
+    text = str(value)
+    if '"' in text or "\t" in text or "\n" in text or "\r" in text:
+        text = '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def tsv_column(series):
+    """Returns the tsv text of every cell of a column (see tsv_field) as an object array, the text of every distinct value is made once.
+    Raises a TypeError for cells holding unhashable values (e.g. lists)"""
+    codes, uniques = pd.factorize(series)
+    # missing values have code -1, the last text
+    texts = np.array([tsv_field(value) for value in uniques] + [""], dtype=object)
+    return texts[codes]
+
+
+def write_sdrf(df, buffer, chunk_rows=10000, columns=None):
+    """Writes a (sorted, see sort_sdrf_columns) SDRF dataframe as tsv into a binary file-like object in one pass and returns the buffer.
+    The text of every distinct value of a column is made once and the rows are encoded and written in chunks of chunk_rows,
+    which gives the bytes of df.to_csv(sep="\t", index=False) without building the whole file as one string first.
+    columns are the texts of the columns of df (see tsv_column), made here if not given"""
+    try:
+        if columns is None:
+            columns = [tsv_column(df.iloc[:, position]) for position in range(df.shape[1])]
+    except TypeError:
+        # cells holding unhashable values (e.g. lists)
+        columns = None
+    if columns is None or df.shape[1] < 2:
+        # a one column tsv quotes empty cells, leave these cases to pandas
+        df.to_csv(buffer, sep="\t", index=False, encoding="utf-8", lineterminator="\n")
+        return buffer
+    buffer.write(("\t".join(tsv_field(column) for column in df.columns) + "\n").encode("utf-8"))
+    for start in range(0, df.shape[0], chunk_rows):
+        rows = zip(*(column[start:start + chunk_rows] for column in columns))
+        buffer.write("".join("\t".join(row) + "\n" for row in rows).encode("utf-8"))
+    return buffer
+
+
+class IncrementalWriter:
+    """Writes the successive versions of one SDRF dataframe (e.g. the template_df of a session) as tsv (see write_sdrf),
+    converting only the columns that changed since the last export to text. The text of a column is kept under the content hash
+    of its values (see ValidationModule.hash_column), so it is reused when sort_sdrf_columns renames or moves the column"""
+
+    def __init__(self):
+        self._texts = {}
+
+    def write(self, df, buffer, hashes=None):
+        """Writes the dataframe into a binary file-like object and returns the buffer. hashes are the column hashes of df
+        (see ValidationModule.column_hashes), computed here if not given"""
+        if hashes is None:
+            hashes = ValidationModule.column_hashes(df)
+        texts = {}
+        try:
+            for position, column_hash in enumerate(hashes):
+                if column_hash not in texts:
+                    texts[column_hash] = self._texts.get(column_hash)
+                    if texts[column_hash] is None:
+                        texts[column_hash] = tsv_column(df.iloc[:, position])
+        except TypeError:
+            return write_sdrf(df, buffer)
+        self._texts = texts
+        return write_sdrf(df, buffer, columns=[texts[column_hash] for column_hash in hashes])
+
+
+def session_writer():
+    """Returns the IncrementalWriter of the session, which only converts the columns of the SDRF that changed since its last export to text"""
+    return st.session_state.setdefault("sdrf_writer", IncrementalWriter())
+
+
+def export_sdrf(df, ontology_version=None, template=None, digest=None):
+    """Sorts the columns of the dataframe, converts it to tsv and validates it against the template
+    (by default the one selected on the home page).
+    Returns the tsv bytes and the ValidationResult. Both are cached in VALIDATION_CACHE under the content hash of the dataframe,
+    the version of the ontologies (by default the one of the ontology store in the session state) and the template,
+    so exporting an unchanged SDRF again returns at once. digest is the content hash of df (see ValidationModule.hash_df), computed here if not given"""
+    if ontology_version is None:
+        ontology_version = getattr(st.session_state.get("data_dict"), "version", None)
+    if template is None:
+        template = st.session_state.get("template_name", "default")
+    key = (digest or ValidationModule.hash_df(df), ontology_version, template)
+    return VALIDATION_CACHE.get_or_compute(key, _export_sdrf, df, template)
+
+
+def _export_sdrf(df, template):
+    df = sort_sdrf_columns(df)
+    # the sorted columns are hashed once, the writer and the validator of the session only redo the columns that changed
+    hashes = ValidationModule.column_hashes(df)
+    return session_writer().write(df, io.BytesIO(), hashes).getvalue(), session_validator(template).validate(df, hashes)
+
+
+def show_validation_result(result):
+    """Shows the outcome of an SDRF validation as a success, warning or error message, with a table of the rows and columns at fault"""
+    if result.is_valid is None:
+        st.error(result.message)
+    elif result.is_valid:
+        st.success("✅ SDRF validation passed!")
+    else:
+        # Filter out 'nan' errors in 'characteristics[organism]'
+        issues = [
+            issue for issue in result.issues
+            if issue.value != "nan" and issue.column != "characteristics[organism]"
+        ]
+
+        if issues:  # Show warning only if there are remaining errors
+            filtered_message = "\n".join(ValidationModule.format_issue(issue) for issue in issues)
+            st.warning(f"⚠️ SDRF validation failed! You can still download the file, but it may be invalid.\n\n**Details:**\n{filtered_message}")
+            st.dataframe(ValidationModule.issues_to_frame(issues))
+
+
+def convert_df(df):
+    """This function requires a dataframe, sorts its columns (see sort_sdrf_columns), validates it and shows the validation result.
+    Returns the tsv file as bytes to be downloaded"""
+    data, result = export_sdrf(df)
+    show_validation_result(result)
+    return data
+
+
+def sdrf_download(df, file_name="intermediate_SDRF.sdrf.tsv"):
+    """Sidebar download of the SDRF file. The file is only exported and validated when the user asks for it,
+    not on every rerun of the page. The prepared file is kept in the session state under the content hash of the dataframe,
+    so it stays downloadable (and its validation result visible) until the dataframe changes"""
+    digest = ValidationModule.hash_df(df)
+    prepared = st.session_state.get("prepared_sdrf")
+    if prepared is not None and prepared["hash"] != digest:
+        prepared = None
+    if prepared is None:
+        if st.button("Prepare SDRF file for download", help="Sorts the columns and validates your SDRF file"):
+            data, result = export_sdrf(df, digest=digest)
+            prepared = {"hash": digest, "data": data, "result": result}
+            st.session_state["prepared_sdrf"] = prepared
+    if prepared is not None:
+        show_validation_result(prepared["result"])
+        st.download_button("Press to download SDRF file", prepared["data"], file_name, help="download your SDRF file")
+
+
+def autocomplete_species_search(taxum_list, search_term, limit=500):
+    """Searches a list of species names (or a prebuilt SearchModule.TermIndex over it) for the search term and lets the user
+    pick the exact match or some of the best ranked names containing it. Returns the selection or None.
+    Pass the index of the ontology store (data_dict.search_index) where possible, a list is indexed once per list object
+    and process (see SearchModule.index_for)"""
+    if (search_term == "") or (search_term == None):
+        return None
+    from SearchModule import index_for
+    index = index_for(taxum_list)
+    col1, col2 = st.columns(2)
+    # the index returns the exact match and the best ranked options, results are memoised per search term
+    result = index.search(search_term, limit)
+    filtered_options = result.matches
+    if result.exact is not None:
+        with col1:
+            st.write(f"An exact match was found: **{result.exact}**")
+        with col2:
+            use_exact_match  = st.checkbox("Use exact match", key=f"exact_{search_term}")
+            if use_exact_match:
+                return result.exact
+    if result.truncated:
+        st.write(f"Too many closely related options to display (>{limit}). Only the best matches are shown, please refine your search.")
+    if len(filtered_options) > 0:
+        with col1:
+            selected_options = st.multiselect("Some options closely matching your search time could be found", filtered_options)      
+        # Display the selected options
+        with col2:
+            if selected_options:
+                st.write("You selected:", selected_options)
+                use_options = st.checkbox("Use selected options", key=f"selected_{search_term}")
+                if use_options:
+                    return selected_options
+    if len(filtered_options) == 0:
+        st.write("No options found. Please refine your search.")
+
+
+def suggest_ontology_terms(values, index, key, k=5):
+    """Shows, for every value that is not an ontology term, the k most similar terms of the ontology (see SearchModule.NgramIndex)
+    in a dropdown menu with the best suggestion preselected.
+    Returns {value: term} for the values the user chose a replacement for, once the replace button is pressed, otherwise None"""
+    keep = "(keep as is)"
+    suggestions = index.suggest(values, k=k)
+    choices = {}
+    for value, terms in suggestions.items():
+        options = [term for term, score in terms] + [keep]
+        choices[value] = st.selectbox(f"Suggestions for **{value}**", options, index=0, key=f"{key}_{value}")
+    if st.button("Replace with the selected terms", key=f"{key}_replace"):
+        return {value: term for value, term in choices.items() if term != keep}
+    return None
@@ -0,0 +1,424 @@
+import heapq
+import bisect
+import functools
+import threading
+from collections import namedtuple, OrderedDict
+
+import numpy as np
+
+# exact is the term that matches the query apart from case (or None), matches the ranked terms containing the query
+# (at most limit) and truncated is True if more terms contain the query than were returned
+SearchResult = namedtuple("SearchResult", ["exact", "matches", "truncated"])
+
+# terms are joined into one string with this separator, it cannot be part of a query
+SEPARATOR = "\n"
+
+
+class TermIndex:
+    """Case-insensitive search index over a list of ontology terms, e.g. the names of one NCBITaxon kingdom.
+    Built once, it answers an exact lookup with one dictionary access, a prefix search with a binary search over the
+    sorted case-folded terms and a substring search with str.find over all case-folded terms joined into one string,
+    so no term is lower-cased again at query time. Results of the last queries are memoised.
+    Ranking: exact match, then terms starting with the query (shortest first), then terms containing it
+    (earliest and shortest first)."""
+
+    def __init__(self, terms, cache_size=256):
+        self.terms = list(dict.fromkeys(term for term in terms if isinstance(term, str)))
+        folded = [term.casefold() for term in self.terms]
+        self._exact = {}
+        for i, key in enumerate(folded):
+            self._exact.setdefault(key, i)
+        order = sorted(range(len(folded)), key=folded.__getitem__)
+        self._sorted_keys = [folded[i] for i in order]
+        self._sorted_ids = order
+        self._haystack = SEPARATOR.join(folded)
+        self._offsets = []
+        offset = 0
+        for key in folded:
+            self._offsets.append(offset)
+            offset += len(key) + len(SEPARATOR)
+        self.search = functools.lru_cache(maxsize=cache_size)(self._search)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def exact(self, query):
+        """Returns the term equal to the query apart from case, or None"""
+        i = self._exact.get(query.casefold())
+        return None if i is None else self.terms[i]
+
+    def prefix_ids(self, query):
+        """Returns the ids of all terms starting with the query"""
+        key = query.casefold()
+        lo = bisect.bisect_left(self._sorted_keys, key)
+        hi = bisect.bisect_left(self._sorted_keys, key + "\U0010ffff", lo)
+        return self._sorted_ids[lo:hi]
+
+    def substring_ids(self, query, limit):
+        """Returns the ids of at most limit terms that contain the query but do not start with it, in list order"""
+        key = query.casefold()
+        ids = []
+        position = self._haystack.find(key)
+        while position != -1 and len(ids) < limit:
+            i = bisect.bisect_right(self._offsets, position) - 1
+            if position != self._offsets[i]:
+                ids.append(i)
+            # continue with the next term, a term is reported once
+            if i + 1 == len(self._offsets):
+                break
+            position = self._haystack.find(key, self._offsets[i + 1])
+        return ids
+
+    def _search(self, query, limit=500):
+        query = query.strip()
+        if not query or SEPARATOR in query:
+            return SearchResult(None, [], False)
+        exact = self.exact(query)
+        prefix = self.prefix_ids(query)
+        if len(prefix) > limit:
+            ids = heapq.nsmallest(limit + 1, prefix, key=lambda i: (len(self.terms[i]), i))
+            return SearchResult(exact, [self.terms[i] for i in ids[:limit]], True)
+        prefix = sorted(prefix, key=lambda i: (len(self.terms[i]), i))
+        # look a bit further than needed, so the substring matches can be ranked on more than their position in the list
+        substring = self.substring_ids(query, (limit - len(prefix)) * 4 + 1)
+        key = query.casefold()
+        substring.sort(key=lambda i: (self._haystack.find(key, self._offsets[i]) - self._offsets[i], len(self.terms[i]), i))
+        ids = prefix + substring
+        matches = [self.terms[i] for i in ids[:limit]]
+        return SearchResult(exact, matches, len(ids) > limit)
+
+
+def char_ngrams(text, n=3):
+    """Returns the set of character n-grams of a case-folded text, padded with a space on both sides so short words and
+    word boundaries get their own n-grams"""
+    text = f" {' '.join(text.casefold().split())} "
+    if len(text) <= n:
+        return {text}
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class NgramIndex:
+    """Character n-gram similarity index over a list of ontology terms, used to suggest the closest terms for values
+    that are not in an ontology. Every term is a sparse binary vector of its n-grams, stored as an inverted index
+    (for every n-gram the sorted ids of the terms containing it, in one flat numpy array).
+    suggest() scores a whole batch of values in one pass: the postings of all their n-grams are concatenated and counted
+    with one np.bincount per chunk of values, which gives the number of shared n-grams of every (value, term) pair.
+    The score is the cosine similarity of the two n-gram sets."""
+
+    def __init__(self, terms, n=3):
+        self.n = n
+        self.terms = list(dict.fromkeys(term for term in terms if isinstance(term, str)))
+        vocabulary = {}
+        term_ids, gram_ids = [], []
+        for i, term in enumerate(self.terms):
+            for gram in char_ngrams(term, n):
+                term_ids.append(i)
+                gram_ids.append(vocabulary.setdefault(gram, len(vocabulary)))
+        self._vocabulary = vocabulary
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        gram_ids = np.asarray(gram_ids, dtype=np.int32)
+        order = np.argsort(gram_ids, kind="stable")
+        self._postings = term_ids[order]
+        self._starts = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(gram_ids, minlength=len(vocabulary)), out=self._starts[1:])
+        self._norms = np.sqrt(np.bincount(term_ids, minlength=len(self.terms))).astype(np.float32)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def _query_postings(self, value):
+        """Returns the term ids of all postings of the known n-grams of a value and the number of n-grams of the value"""
+        grams = char_ngrams(value, self.n)
+        ids = [self._vocabulary[gram] for gram in grams if gram in self._vocabulary]
+        if not ids:
+            return np.empty(0, dtype=np.int32), len(grams)
+        return np.concatenate([self._postings[self._starts[g]:self._starts[g + 1]] for g in ids]), len(grams)
+
+    def suggest(self, values, k=5, min_score=0.3, max_cells=4_000_000):
+        """Returns {value: [(term, score), ...]} with the k most similar terms of every value, best first.
+        Values are scored in chunks so that at most max_cells (value, term) counts are held at once"""
+        values = list(dict.fromkeys(str(value) for value in values))
+        suggestions = {}
+        if not self.terms:
+            return {value: [] for value in values}
+        chunk = max(1, max_cells // len(self.terms))
+        for start in range(0, len(values), chunk):
+            batch = values[start:start + chunk]
+            postings = [self._query_postings(value) for value in batch]
+            rows = np.repeat(np.arange(len(batch), dtype=np.int64), [len(p) for p, _ in postings])
+            cells = rows * len(self.terms) + np.concatenate([p for p, _ in postings]).astype(np.int64)
+            shared = np.bincount(cells, minlength=len(batch) * len(self.terms)).reshape(len(batch), len(self.terms))
+            value_norms = np.sqrt(np.array([size for _, size in postings], dtype=np.float32))
+            scores = shared / (value_norms[:, None] * self._norms[None, :])
+            top = min(k, len(self.terms))
+            best = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+            for row, value in enumerate(batch):
+                ranked = best[row][np.argsort(-scores[row, best[row]], kind="stable")]
+                suggestions[value] = [
+                    (self.terms[i], round(float(scores[row, i]), 3)) for i in ranked if scores[row, i] >= min_score
+                ]
+        return suggestions
+
+
+# indexes built by index_for and node_table_for, by identity of the list they were built from
+_INDEXES = OrderedDict()
+_INDEXES_LOCK = threading.Lock()
+
+
+def _cached_by_identity(obj, factory, maxsize=32):
+    """Returns factory(obj), built once per object and process.
+    The lists of the ontology store are shared read-only tuples, so their identity is a cheap cache key
+    (hashing a 100k-term tuple on every rerun is not). The object is kept alive with its index, so its id is not reused,
+    and only the maxsize most recently used indexes are kept."""
+    key = (id(obj), factory)
+    with _INDEXES_LOCK:
+        entry = _INDEXES.get(key)
+        if entry is not None and entry[0] is obj:
+            _INDEXES.move_to_end(key)
+            return entry[1]
+    index = factory(obj)
+    with _INDEXES_LOCK:
+        _INDEXES[key] = (obj, index)
+        while len(_INDEXES) > maxsize:
+            _INDEXES.popitem(last=False)
+    return index
+
+
+def index_for(terms):
+    """Returns a TermIndex over a list of terms, built once per list object and process"""
+    if isinstance(terms, TermIndex):
+        return terms
+    return _cached_by_identity(terms, TermIndex)
+
+
+def membership_for(terms):
+    """Returns a frozenset of a list of terms, built once per list object and process, for membership checks"""
+    if isinstance(terms, frozenset):
+        return terms
+    return _cached_by_identity(terms, frozenset)
+
+
+def node_table_for(nodes):
+    """Returns a NodeTable over tree-select nodes, built once per node list object and process"""
+    if isinstance(nodes, NodeTable):
+        return nodes
+    return _cached_by_identity(nodes, NodeTable)
+
+
+class NodeTable:
+    """Indexed table of the nodes of a streamlit_tree_select tree, used to send a large tree to the browser one level at a time.
+    Every node gets an integer id (in preorder), its label and the ids of its children are kept in flat lists.
+    nodes() returns the roots and the children of the loaded nodes only, the values of the nodes are their ids instead of
+    their label paths. A node that has children which are not loaded gets one placeholder child, so the browser still shows
+    it can be expanded. The list of child nodes of a node is built once and cached."""
+
+    PLACEHOLDER = "loading..."
+
+    def __init__(self, nodes=()):
+        self.labels = []
+        self.children = []
+        self.roots = []
+        stack = [(node, None) for node in reversed(nodes)]
+        while stack:
+            node, parent = stack.pop()
+            node_id = self._add(node["label"], parent)
+            stack.extend((child, node_id) for child in reversed(node.get("children") or ()))
+        self._payloads = {}
+
+    @classmethod
+    def from_tree(cls, tree):
+        """Returns the table of a nested dictionary tree (e.g. disease_dict). The ids and labels are the same as in the table of
+        its tree-select nodes (see OntologyBundle.tree_to_nodes), but the node list is never built"""
+        table = cls()
+        stack = [(label, subtree, None) for label, subtree in reversed(tree.items())]
+        while stack:
+            label, subtree, parent = stack.pop()
+            node_id = table._add(label, parent)
+            if subtree:
+                stack.extend((child, child_tree, node_id) for child, child_tree in reversed(subtree.items()))
+        return table
+
+    def _add(self, label, parent):
+        node_id = len(self.labels)
+        self.labels.append(label)
+        self.children.append([])
+        if parent is None:
+            self.roots.append(node_id)
+        else:
+            self.children[parent].append(node_id)
+        return node_id
+
+    def __len__(self):
+        return len(self.labels)
+
+    def label(self, value):
+        """Returns the label of a node given its value in the tree-select payload"""
+        return self.labels[int(value)]
+
+    def _node(self, node_id):
+        node = {"label": self.labels[node_id], "value": str(node_id)}
+        if self.children[node_id]:
+            node["children"] = [
+                {"label": self.PLACEHOLDER, "value": f"{node_id}-placeholder", "disabled": True, "showCheckbox": False}
+            ]
+        return node
+
+    def child_nodes(self, node_id=None):
+        """Returns the payload of the children of a node (of the roots if node_id is None), with placeholders for their own children"""
+        if node_id not in self._payloads:
+            ids = self.roots if node_id is None else self.children[node_id]
+            self._payloads[node_id] = tuple(self._node(i) for i in ids)
+        return self._payloads[node_id]
+
+    def nodes(self, loaded=()):
+        """Returns the tree-select payload with the children of the loaded nodes (values as returned by tree_select) filled in"""
+        loaded = {int(value) for value in loaded if str(value).isdigit()}
+
+        def fill(payload):
+            result = []
+            for node in payload:
+                node_id = int(node["value"])
+                if node_id in loaded and self.children[node_id]:
+                    node = dict(node, children=fill(self.child_nodes(node_id)))
+                result.append(node)
+            return result
+
+        return fill(self.child_nodes())
+
+
+def closure_index_for(tree):
+    """Returns a ClosureIndex over an ontology tree, built once per tree object and process"""
+    if isinstance(tree, ClosureIndex):
+        return tree
+    return _cached_by_identity(tree, ClosureIndex)
+
+
+class ClosureIndex:
+    """Ancestor/descendant index over an ontology tree (a nested {label: {child label: ...}} dictionary).
+    The nodes are numbered in preorder and every node keeps the last preorder number of its subtree, so node x lies under
+    node y exactly when first[y] < x <= last[y]: a subsumption test is two comparisons, the size of a subtree one subtraction
+    and the labels under a node one slice of the label array. Ancestors are found by walking the parent array.
+    A term can occur at several places of the tree (ontologies are graphs, the trees repeat shared subtrees),
+    queries on a term consider all of its occurrences."""
+
+    def __init__(self, tree):
+        labels, parents, depths = [], [], []
+        last = []
+        stack = [(label, children, -1, 0) for label, children in reversed(list(tree.items()))]
+        open_nodes = []
+        while stack:
+            label, children, parent, depth = stack.pop()
+            # close the nodes whose subtree ended before this node
+            while open_nodes and depths[open_nodes[-1]] >= depth:
+                last[open_nodes.pop()] = len(labels) - 1
+            node = len(labels)
+            labels.append(label)
+            parents.append(parent)
+            depths.append(depth)
+            last.append(node)
+            open_nodes.append(node)
+            if children:
+                stack.extend((child, grandchildren, node, depth + 1) for child, grandchildren in reversed(list(children.items())))
+        while open_nodes:
+            last[open_nodes.pop()] = len(labels) - 1
+        self.terms = list(dict.fromkeys(labels))
+        term_ids = {term: i for i, term in enumerate(self.terms)}
+        self._term = np.array([term_ids[label] for label in labels], dtype=np.int32)
+        self._parent = np.array(parents, dtype=np.int32)
+        self._depth = np.array(depths, dtype=np.int32)
+        self._last = np.array(last, dtype=np.int32)
+        order = np.argsort(self._term, kind="stable")
+        bounds = np.searchsorted(self._term[order], np.arange(len(self.terms) + 1))
+        self._occurrences = {term: order[bounds[i]:bounds[i + 1]] for term, i in term_ids.items()}
+
+    def __len__(self):
+        """Returns the number of nodes in the tree"""
+        return len(self._term)
+
+    def __contains__(self, term):
+        return term in self._occurrences
+
+    def occurrences(self, term):
+        """Returns the preorder numbers of the nodes of a term (empty if the term is not in the tree)"""
+        return self._occurrences.get(term, np.empty(0, dtype=np.int64))
+
+    def is_descendant(self, term, ancestor):
+        """Checks if a term lies under ancestor (a term is not its own descendant)"""
+        nodes = self.occurrences(term)
+        for node in self.occurrences(ancestor):
+            if np.any((nodes > node) & (nodes <= self._last[node])):
+                return True
+        return False
+
+    def ancestors(self, term):
+        """Returns the labels of all terms above a term, nearest first"""
+        result = {}
+        for node in self.occurrences(term):
+            parent = self._parent[node]
+            while parent != -1:
+                result.setdefault(self.terms[self._term[parent]], self._depth[node] - self._depth[parent])
+                parent = self._parent[parent]
+        return sorted(result, key=result.get)
+
+    def subtree_size(self, term):
+        """Returns the number of nodes under a term (the largest of its occurrences), 0 for a leaf or an unknown term"""
+        nodes = self.occurrences(term)
+        if len(nodes) == 0:
+            return 0
+        return int(np.max(self._last[nodes] - nodes))
+
+    def descendants(self, term):
+        """Returns the set of labels of all terms under a term"""
+        ids = [self._term[node + 1:self._last[node] + 1] for node in self.occurrences(term)]
+        if not ids:
+            return set()
+        return {self.terms[i] for i in np.unique(np.concatenate(ids))}
+
+    def descendant_mask(self, terms, ancestor):
+        """Returns a boolean array telling for every term of a list or column whether it lies under ancestor"""
+        under = self.descendants(ancestor)
+        return np.array([term in under for term in terms], dtype=bool)
+
+
+def fold(term):
+    """Returns the case-folded form of a term with its whitespace collapsed, the key of the term and synonym indexes"""
+    return " ".join(str(term).casefold().split())
+
+
+class CategoryIndex:
+    """Inverted index from every term of several ontologies (case-folded labels and synonyms) to the categories it belongs to.
+    Used to find out which ontology (and so which SDRF column) the values of an uploaded metadata column belong to:
+    coverage() looks up every distinct value once and returns, per category, the fraction of the values it knows."""
+
+    def __init__(self, terms_by_category):
+        self.categories = list(terms_by_category)
+        index = {}
+        for category_id, terms in enumerate(terms_by_category.values()):
+            for term in terms:
+                key = fold(term)
+                ids = index.get(key)
+                if ids is None:
+                    index[key] = (category_id,)
+                elif ids[-1] != category_id:
+                    index[key] = ids + (category_id,)
+        self._index = index
+
+    def __len__(self):
+        return len(self._index)
+
+    def categories_of(self, term):
+        """Returns the categories a term (label or synonym, in any case) belongs to"""
+        return [self.categories[i] for i in self._index.get(fold(term), ())]
+
+    def coverage(self, values):
+        """Returns [(category, coverage)] for the categories that know at least one of the distinct non-empty values,
+        coverage being the fraction of those values that are terms of the category, best first"""
+        distinct = {fold(value) for value in values if isinstance(value, str) and value.strip()}
+        if not distinct:
+            return []
+        counts = np.zeros(len(self.categories), dtype=np.int64)
+        for key in distinct:
+            for i in self._index.get(key, ()):
+                counts[i] += 1
+        order = np.argsort(-counts, kind="stable")
+        return [(self.categories[i], round(float(counts[i]) / len(distinct), 3)) for i in order if counts[i]]
@@ -0,0 +1,703 @@
+import re
+import sys
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import namedtuple, OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from SearchModule import membership_for
+
+# validation runs in the process of the app on the in-memory dataframe: nothing is written to disk and no parse_sdrf
+# subprocess is started, so sessions validating at the same time cannot see each other's files
+
+DEFAULT_TEMPLATE = "default"
+MASS_SPECTROMETRY_TEMPLATE = "mass_spectrometry"
+TOOL_NOT_FOUND_MESSAGE = "SDRF validation tool not found. Install `sdrf-pipelines` via `pip install sdrf-pipelines`."
+
+# one validation problem, row is the position of the row in the dataframe (None if the problem is not about one row),
+# column the SDRF column (None if the problem is about the whole file) and level "error" or "warning"
+# rows lists all rows a problem was found in when one issue stands for several rows (the native engine reports every
+# wrong value once)
+ValidationIssue = namedtuple("ValidationIssue", ["row", "column", "value", "message", "level", "rows"], defaults=(None,))
+
+# is_valid is True, False or None if the file could not be validated, message is the text version of the issues
+ValidationResult = namedtuple("ValidationResult", ["is_valid", "message", "issues"])
+
+
+def format_issue(issue):
+    """Returns the one line description of an issue, in the format of the parse_sdrf command line tool"""
+    if issue.row is not None and issue.column is not None and issue.value is not None:
+        return f'{{row: {issue.row}, column: "{issue.column}"}}: "{issue.value}" {issue.message}'
+    return issue.message
+
+
+def to_sdrf_frame(df):
+    """Returns the dataframe the way sdrf-pipelines reads an SDRF file: empty cells as "" and lower case column names and values"""
+    from sdrf_pipelines.sdrf.sdrf import SdrfDataFrame
+    df = df.replace(np.nan, "").reset_index(drop=True)
+    df.columns = [str(column).lower() for column in df.columns]
+    for column in df.select_dtypes(include=["object"]).columns:
+        df[column] = df[column].astype(str).str.lower()
+    return SdrfDataFrame(df)
+
+
+def issue_from_error(error):
+    """Converts an sdrf-pipelines LogicError into a ValidationIssue"""
+    row = getattr(error, "row", None)
+    level = "warning" if getattr(error, "_error_type", logging.ERROR) == logging.WARNING else "error"
+    return ValidationIssue(
+        row=None if row is None or row < 0 else int(row),
+        column=getattr(error, "column", None),
+        value=getattr(error, "value", None),
+        message=getattr(error, "message", str(error)),
+        level=level,
+    )
+
+
+def validate_dataframe(df, template=DEFAULT_TEMPLATE):
+    """Validates an SDRF dataframe against a template of sdrf-pipelines and the mass spectrometry template,
+    like `parse_sdrf validate-sdrf` does for a file. Returns a ValidationResult with the issues found"""
+    try:
+        sdrf = to_sdrf_frame(df)
+    except ImportError:
+        return ValidationResult(None, TOOL_NOT_FOUND_MESSAGE, [])
+    errors = sdrf.validate(template)
+    if template != MASS_SPECTROMETRY_TEMPLATE:
+        errors = errors + sdrf.validate(MASS_SPECTROMETRY_TEMPLATE)
+    if hasattr(sdrf, "validate_experimental_design"):
+        errors = errors + sdrf.validate_experimental_design()
+    issues = [issue_from_error(error) for error in errors]
+    is_valid = not any(issue.level == "error" for issue in issues)
+    return ValidationResult(is_valid, "\n".join(format_issue(issue) for issue in issues), issues)
+
+
+def issues_to_frame(issues):
+    """Returns the issues as a dataframe with one row per issue, for display"""
+    return pd.DataFrame(issues, columns=ValidationIssue._fields)
+
+
+def hash_df(df, hashes=None):
+    """Returns a content hash of a dataframe (column names, their order and all values, see hash_column).
+    Used to recognise an SDRF that was already exported and validated, so this is not redone.
+    hashes are the column hashes of df (see column_hashes), computed here if not given"""
+    digest = hashlib.sha256()
+    digest.update("\t".join(map(str, df.columns)).encode("utf-8"))
+    for column_hash in column_hashes(df) if hashes is None else hashes:
+        digest.update(column_hash.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def column_hashes(df):
+    """Returns the content hash of every column of a dataframe (see hash_column), in column order"""
+    return [hash_column(df.iloc[:, position]) for position in range(df.shape[1])]
+
+
+def hash_column(series):
+    """Returns a content hash of the values of one column (not its name). Arrow backed text columns (the text dtype of
+    recent pandas) are hashed from their arrow buffers without converting the values, other columns from the joined text
+    of their values, which is faster than pandas' hash_pandas_object on the short columns of a wide SDRF"""
+    digest = hashlib.sha256()
+    if hasattr(series.array, "__arrow_array__"):
+        import pyarrow as pa
+        array = pa.array(series.array)
+        for chunk in array.chunks if isinstance(array, pa.ChunkedArray) else [array]:
+            digest.update(f"arrow:{chunk.type}:{chunk.offset}:{len(chunk)};".encode("utf-8"))
+            for buffer in chunk.buffers():
+                if buffer is not None:
+                    digest.update(buffer)
+        return digest.hexdigest()
+    values = series.tolist()
+    try:
+        digest.update(("text:" + "\x00".join(values)).encode("utf-8"))
+    except TypeError:
+        # missing values, numbers or lists
+        digest.update(("repr:" + "\x00".join(map(repr, values))).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def result_size(value):
+    """Returns an estimate of the memory footprint in bytes of a cached value: bytes, strings and (named) tuples of them"""
+    size = sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        size += sum(result_size(item) for item in value)
+    return size
+
+
+class ValidationCache:
+    """Least recently used cache of validation results, shared by all sessions of the process.
+    Results are stored under a content key (see hash_df), so toggling between pages or exporting an unchanged SDRF
+    again returns the earlier result instead of validating again. The cache is bounded by its number of entries and by
+    the bytes the entries take, the least recently used entries are evicted first.
+    stats() returns the hit, miss and eviction counters, entries() what is cached."""
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = result_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                # never cache a result that would evict everything else
+                return
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._bytes -= self._entries.popitem(last=False)[1][1]
+                self.evictions += 1
+
+    def get_or_compute(self, key, function, *args, **kwargs):
+        """Returns the cached value of the key, or computes it with function(*args, **kwargs) and caches it"""
+        value = self.get(key)
+        if value is None:
+            value = function(*args, **kwargs)
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Returns the counters and the size of the cache"""
+        requests = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / requests, 3) if requests else None,
+        }
+
+    def entries(self):
+        """Returns the keys and sizes of the cached entries, from least to most recently used"""
+        with self._lock:
+            return [{"key": key, "bytes": size} for key, (value, size) in self._entries.items()]
+
+
+def normalise_values(series, synonyms):
+    """Maps the values of a column to their preferred ontology label with a synonym index ({case-folded synonym: label},
+    see BuildModule.store_synonym_indexes). Every distinct value is looked up once and the column is mapped in one pass.
+    Values without a synonym (and empty cells) are returned unchanged"""
+    mapping = {}
+    for value in pd.unique(series.dropna()):
+        label = synonyms.get(" ".join(str(value).casefold().split()))
+        if label is not None and label != value:
+            mapping[value] = label
+    if not mapping:
+        return series.copy()
+    return series.map(mapping).fillna(series)
+
+
+# the SDRF age format: years, months and days, each optional (e.g. 12Y 3M 4D), a range (e.g. 48Y-84Y) or two ages separated by /
+AGE_PATTERN = re.compile(
+    r"^(\s*\d+\s*Y)?(\s*\d+\s*M)?(\s*\d+\s*D)?(|\s*-\s*\d+\s*Y)?(|\s*-\s*\d+\s*M)?(|\s*-\s*\d+\s*D)?(/)?(|\s*\d+\s*Y)?(|\s*\d+\s*M)?(|\s*\d+\s*D)?$"
+)
+AGE_PART = re.compile(r"(\d+)\s*([YMD])")
+# age cells that are not checked
+AGE_NOT_GIVEN = ["", "empty", "None", "Not available", "not available"]
+# days per unit used to turn ages into day spans, years and months are approximated
+DAYS_PER_UNIT = {"Y": 365, "M": 30, "D": 1}
+
+# is_valid tells if all ages are in the SDRF format, wrong_values the distinct values that are not
+# and rows the index labels of the rows that hold them
+AgeCheck = namedtuple("AgeCheck", ["is_valid", "wrong_values", "rows"])
+
+
+def is_valid_age(value):
+    """Checks if one age (e.g. 12Y 3M 4D or 48Y-84Y) is in the SDRF age format"""
+    return AGE_PATTERN.fullmatch(str(value)) is not None
+
+
+def check_ages(series):
+    """Checks the ages of a column in one pass over its distinct values. Empty cells and the values in AGE_NOT_GIVEN are skipped.
+    Returns an AgeCheck with the wrong values and the index labels of the rows that hold them"""
+    given = series.dropna().astype(str)
+    given = given[~given.isin(AGE_NOT_GIVEN)]
+    distinct = pd.Series(pd.unique(given), dtype=object)
+    wrong_values = distinct[~distinct.str.fullmatch(AGE_PATTERN)].tolist()
+    rows = given.index[given.isin(wrong_values)].tolist()
+    return AgeCheck(not wrong_values, wrong_values, rows)
+
+
+def parse_age(value):
+    """Parses an age in the SDRF format into a (minimum, maximum) span in days, e.g. 1Y 6M -> (545, 545), 48Y-84Y -> (17520, 30660).
+    Years count as 365 days and months as 30. Returns None for values that are not valid ages or that hold no age at all"""
+    value = str(value)
+    if not is_valid_age(value):
+        return None
+    days = []
+    for part in re.split(r"[-/]", value):
+        units = AGE_PART.findall(part)
+        if units:
+            days.append(sum(int(number) * DAYS_PER_UNIT[unit] for number, unit in units))
+    if not days:
+        return None
+    return min(days), max(days)
+
+
+def parse_ages(series):
+    """Parses a column of ages into a dataframe with the min_days and max_days of every row (NaN where there is no valid age).
+    Every distinct value is parsed once"""
+    spans = {value: parse_age(value) for value in pd.unique(series.dropna())}
+    spans = {value: span for value, span in spans.items() if span is not None}
+    return pd.DataFrame(
+        {
+            "min_days": series.map({value: span[0] for value, span in spans.items()}).astype(float),
+            "max_days": series.map({value: span[1] for value, span in spans.items()}).astype(float),
+        },
+        index=series.index,
+    )
+
+
+
+# native validation engine: every rule of the rule table is evaluated once per column, over the distinct values of the column
+
+# kind is one of
+#   vocabulary: the values must be one of the values in argument
+#   ontology:   the values must be terms of one of the ontology element lists (data_dict keys) in argument
+#   format:     the values must match the compiled pattern in argument
+#   unique:     the combination of the columns must be unique over the rows
+#   consistent: every value of the first column (a sample) must have one value in each of the other columns
+# columns are SDRF column names, vocabulary, ontology and format rules also apply to the numbered copies of a column
+# (e.g. characteristics[cell type]_1)
+Rule = namedtuple("Rule", ["kind", "columns", "argument", "level", "message"])
+
+TEMPLATE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+# cells that count as not filled in
+MISSING_VALUES = ["", "empty"]
+# values that are accepted in every column instead of a term
+NOT_GIVEN_VALUES = {"not available", "not applicable"}
+SEX_VALUES = ("M", "F", "NA", "unknown", "male", "female")
+TOLERANCE_PATTERN = re.compile(r"^\s*\d+(\.\d+)?\s*(ppm|Da)\s*$")
+NUMBER_PATTERN = re.compile(r"^\s*\d+\s*$")
+MODIFICATION_PATTERN = re.compile(r"^\s*[A-Z]{2}=[^;]*(;\s*[A-Z]{2}=[^;]*)*$")
+TERM_NAME = re.compile(r"(?:^|;)\s*NT=([^;]+)")
+
+RULES = [
+    Rule("vocabulary", ("characteristics[sex]",), SEX_VALUES, "error", "is not accepted, use M, F or unknown"),
+    Rule("vocabulary", ("technology type",), ("proteomic profiling by mass spectrometry",), "error", "is not an accepted technology type"),
+    Rule("ontology", ("characteristics[organism]",), ("all_organism_elements",), "warning", "is not one of the common organisms, check it is an NCBITaxon term"),
+    Rule("ontology", ("characteristics[organism part]",), ("all_organism_part_elements",), "error", "is not a term of the organism part ontology"),
+    Rule("ontology", ("characteristics[disease]",), ("all_disease_elements",), "error", "is not a term of the disease ontology"),
+    Rule("ontology", ("characteristics[cell type]",), ("all_cell_elements",), "error", "is not a term of the cell type ontology"),
+    Rule("ontology", ("characteristics[cell line]",), ("all_cell_line_elements",), "error", "is not a term of the cell line ontology"),
+    Rule("ontology", ("characteristics[ancestry category]",), ("all_ancestry_category_elements",), "error", "is not a term of the ancestry category ontology"),
+    Rule("ontology", ("characteristics[developmental stage]",), ("all_developmental_stage_elements",), "error", "is not a term of the developmental stage ontology"),
+    Rule("ontology", ("characteristics[enrichment process]",), ("all_enrichment_elements",), "error", "is not a term of the enrichment process ontology"),
+    Rule("ontology", ("comment[label]",), ("all_label_elements",), "error", "is not a term of the label ontology"),
+    Rule("ontology", ("comment[instrument]",), ("all_instrument_elements",), "error", "is not a term of the instrument ontology"),
+    Rule("ontology", ("comment[dissociation method]",), ("all_dissociation_elements",), "error", "is not a term of the dissociation method ontology"),
+    Rule("ontology", ("comment[fractionation method]",), ("all_fractionation_method_elements",), "error", "is not a term of the fractionation method ontology"),
+    Rule("ontology", ("comment[reduction reagent]",), ("all_reduction_reagent_elements",), "error", "is not a term of the reduction reagent ontology"),
+    Rule("ontology", ("comment[alkylation reagent]",), ("all_alkylation_elements",), "error", "is not a term of the alkylation reagent ontology"),
+    Rule("ontology", ("comment[cleavage agent details]",), ("cleavage_list",), "error", "is not a known cleavage agent"),
+    Rule("format", ("characteristics[age]",), AGE_PATTERN, "error", "is not an age in the Y M D format, e.g. 12Y 3M 4D or 48Y-84Y"),
+    Rule("format", ("comment[precursor mass tolerance]", "comment[fragment mass tolerance]"), TOLERANCE_PATTERN, "error", "is not a tolerance such as 10 ppm or 0.02 Da"),
+    Rule("format", ("characteristics[biological replicate]", "comment[technical replicate]", "comment[fraction identifier]"), NUMBER_PATTERN, "error", "is not a number"),
+    Rule("format", ("comment[modification parameters]",), MODIFICATION_PATTERN, "warning", "is not in the NT=name;AC=accession;... format"),
+    Rule("unique", ("source name", "comment[data file]", "comment[label]", "comment[fraction identifier]"), None, "error", "the sample is listed more than once for the same data file, label and fraction identifier"),
+    Rule("consistent", ("source name", "characteristics[organism]", "characteristics[sex]", "characteristics[age]", "characteristics[individual]"), None, "error", "one source name has different values"),
+]
+
+
+def template_columns(template, folder=TEMPLATE_FOLDER):
+    """Returns the columns of an SDRF template (the header of templates/sdrf-<template>.sdrf.tsv), the required columns of the template"""
+    path = os.path.join(folder, f"sdrf-{template}.sdrf.tsv")
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        header = f.readline()
+    return [column.strip() for column in header.split("\t") if column.strip()]
+
+
+def base_column(column):
+    """Returns the SDRF column name without the number of a copy, e.g. characteristics[cell type]_1 -> characteristics[cell type]"""
+    return re.sub(r"_\d+$", "", str(column))
+
+
+def term_name(value):
+    """Returns the name of an ontology term written in the key=value SDRF format (e.g. NT=Trypsin;AC=MS:1001251 -> Trypsin),
+    or the value itself"""
+    match = TERM_NAME.search(value)
+    return match.group(1).strip() if match else value
+
+
+def membership_index(vocabularies, key):
+    """Returns the frozenset of the terms of a key of vocabularies, the one of the ontology store or one built once per
+    process for any other mapping of term lists"""
+    if hasattr(vocabularies, "membership_index"):
+        return vocabularies.membership_index(key)
+    return membership_for(vocabularies[key])
+
+
+def _is_term(value, indexes):
+    """Whether value, or the name it gives in the NT= format, is a term of one of the indexes (the cleavage agent list keeps
+    its terms as NT=name)"""
+    if any(value in index for index in indexes):
+        return True
+    name = term_name(value)
+    return any(name in index or f"NT={name}" in index for index in indexes)
+
+
+def _given(series):
+    """Returns the distinct filled in values of a column, without the values accepted in every column,
+    as a dict from their text to the value itself"""
+    given = {}
+    for value in pd.unique(series.dropna()):
+        text = str(value)
+        if text not in MISSING_VALUES and text.strip().lower() not in NOT_GIVEN_VALUES:
+            given[text] = value
+    return given
+
+
+def _value_issues(series, column, wrong_values, rule):
+    """Returns one issue per wrong value of a column (a dict from their text to the value, see _given), with all rows that hold it"""
+    issues = []
+    if not wrong_values:
+        return issues
+    text_of = {value: text for text, value in wrong_values.items()}
+    rows_of = series.index[series.isin(list(wrong_values.values()))]
+    grouped = pd.Series(rows_of, index=series.loc[rows_of].values).groupby(level=0, sort=False)
+    for value, rows in grouped:
+        rows = rows.tolist()
+        issues.append(ValidationIssue(rows[0], column, text_of[value], rule.message, rule.level, rows))
+    return issues
+
+
+def check_rule(df, rule, vocabularies=None):
+    """Evaluates one rule on a dataframe and returns the issues it finds"""
+    issues = []
+    if rule.kind in ("vocabulary", "ontology", "format"):
+        if rule.kind == "vocabulary":
+            accepted = membership_for(rule.argument)
+        elif rule.kind == "ontology":
+            if vocabularies is None or not all(key in vocabularies for key in rule.argument):
+                return issues
+            accepted = [membership_index(vocabularies, key) for key in rule.argument]
+        for position, column in enumerate(df.columns):
+            if base_column(column) not in rule.columns:
+                continue
+            series = df.iloc[:, position]
+            given = _given(series)
+            if rule.kind == "format":
+                wrong = {text: value for text, value in given.items() if not rule.argument.fullmatch(text)}
+            elif rule.kind == "ontology":
+                wrong = {text: value for text, value in given.items() if not _is_term(text, accepted)}
+            else:
+                wrong = {text: value for text, value in given.items() if text not in accepted}
+            issues.extend(_value_issues(series, column, wrong, rule))
+    elif rule.kind == "unique":
+        positions = [_first_position(df, column) for column in rule.columns]
+        if None not in positions:
+            keys = [df.iloc[:, position] for position in positions]
+            duplicated = pd.concat(keys, axis=1, ignore_index=True).duplicated(keep=False)
+            for key, rows in df.index[duplicated].to_series().groupby([series[duplicated] for series in keys]):
+                rows = rows.tolist()
+                issues.append(ValidationIssue(rows[0], ", ".join(rule.columns), " / ".join(map(str, key)), rule.message, rule.level, rows))
+    elif rule.kind == "consistent":
+        sample = _first_position(df, rule.columns[0])
+        if sample is not None:
+            samples = df.iloc[:, sample]
+            # every copy of a column counts, the columns of a sorted SDRF can share a name (see ParsingModule.sort_sdrf_columns)
+            for position, column in enumerate(df.columns):
+                if column not in rule.columns[1:]:
+                    continue
+                counts = df.iloc[:, position].groupby(samples).nunique()
+                for value in counts.index[counts > 1]:
+                    rows = df.index[samples == value].tolist()
+                    issues.append(ValidationIssue(rows[0], column, value, f"{rule.message} in {column}", rule.level, rows))
+    return issues
+
+
+def _first_position(df, column):
+    """Returns the position of the first column with this name, or None"""
+    return next((position for position, name in enumerate(df.columns) if name == column), None)
+
+
+# result of check_terms: unknown maps every column with wrong values to {wrong value: row positions},
+# checked lists the columns a rule of the rule table applies to
+TermReport = namedtuple("TermReport", ["unknown", "checked"])
+
+
+def column_rules(column, rules=RULES):
+    """Returns the rules of the rule table about the values of one column (vocabulary, ontology and format rules)"""
+    return [rule for rule in rules if rule.kind in ("vocabulary", "ontology", "format") and base_column(column) in rule.columns]
+
+
+def check_terms(df, columns=None, vocabularies=None, rules=RULES):
+    """Checks the values of the columns (by default all of them) against the vocabulary, ontology and format rules,
+    with one lookup in the membership index of the ontology per distinct value. Returns a TermReport"""
+    df = df.reset_index(drop=True)
+    unknown, checked = {}, []
+    for column in df.columns if columns is None else columns:
+        applying = column_rules(column, rules)
+        if not applying or column not in df.columns:
+            continue
+        checked.append(column)
+        for rule in applying:
+            for issue in check_rule(df[[column]], rule, vocabularies):
+                unknown.setdefault(column, {})[issue.value] = issue.rows
+    return TermReport(unknown, checked)
+
+
+def check_required_columns(df, template):
+    """Returns an issue for every column of the template that is missing or has empty cells"""
+    issues = []
+    for column in template_columns(template):
+        if column not in df.columns:
+            issues.append(ValidationIssue(None, column, None, f"The required column {column} is missing", "error"))
+            continue
+        for position, name in enumerate(df.columns):
+            if name == column:
+                issues.extend(_empty_cell_issues(df.iloc[:, position], column))
+    return issues
+
+
+def _empty_cell_issues(series, column):
+    empty = series.isna() | series.astype(str).isin(MISSING_VALUES)
+    if not empty.any():
+        return []
+    rows = series.index[empty].tolist()
+    return [ValidationIssue(rows[0], column, "", "is empty, fill in the column or use not available", "error", rows)]
+
+
+def validate_native(df, template="default", vocabularies=None, rules=RULES):
+    """Validates an SDRF dataframe with the native rule engine: the required columns of the template (None to skip them)
+    and every rule of the rule table. vocabularies maps the ontology keys of the rules to their terms (e.g. the ontology store),
+    ontology rules whose keys are missing are skipped. Returns one ValidationResult with all issues"""
+    df = df.reset_index(drop=True)
+    issues = check_required_columns(df, template) if template else []
+    for rule in rules:
+        issues.extend(check_rule(df, rule, vocabularies))
+    is_valid = not any(issue.level == "error" for issue in issues)
+    return ValidationResult(is_valid, "\n".join(format_issue(issue) for issue in issues), issues)
+
+
+class IncrementalValidator:
+    """Validates the successive versions of one SDRF dataframe (e.g. the template_df of a session) with the native engine,
+    re-checking only the columns that changed since the last validation.
+
+    Every column is hashed (see hash_column), a column whose hash is unchanged keeps the issues found before. Rules over several
+    columns (unique, consistent) are evaluated again when one of their columns changed. result holds the combined
+    ValidationResult of the whole file, the same as validate_native gives for it"""
+
+    def __init__(self, template="default", vocabularies=None, rules=RULES):
+        self.template = template
+        self.vocabularies = vocabularies
+        self.rules = list(rules)
+        self.column_rules = [rule for rule in self.rules if rule.kind in ("vocabulary", "ontology", "format")]
+        self.required = template_columns(template) if template else []
+        self.result = ValidationResult(True, "", [])
+        self.dirty = []
+        # (column name, number of the column among the columns with this name) -> hash, empty cell issues and issues per column rule
+        self._hashes = {}
+        self._empty_issues = {}
+        self._column_issues = {}
+        self._row_rule_issues = {}
+        self._length = None
+
+    @staticmethod
+    def _column_keys(df):
+        seen = {}
+        keys = []
+        for column in df.columns:
+            keys.append((column, seen.get(column, 0)))
+            seen[column] = seen.get(column, 0) + 1
+        return keys
+
+    def dirty_columns(self, df):
+        """Returns the columns of df that are new or changed since the last validation"""
+        keys = self._column_keys(df)
+        if len(df) != self._length:
+            return [column for column, _ in keys]
+        return [
+            column for position, (column, number) in enumerate(keys)
+            if self._hashes.get((column, number)) != hash_column(df.iloc[:, position])
+        ]
+
+    def validate(self, df, hashes=None):
+        """Validates the dataframe, re-checking the dirty columns only, and returns the combined ValidationResult.
+        The issues are in the same order as the ones of validate_native. hashes are the column hashes of df (see column_hashes),
+        computed here if not given"""
+        df = df.reset_index(drop=True)
+        if len(df) != self._length:
+            self._hashes, self._empty_issues, self._column_issues, self._row_rule_issues = {}, {}, {}, {}
+            self._length = len(df)
+        keys = self._column_keys(df)
+        given_hashes, hashes = hashes, {}
+        self.dirty = []
+        for position, key in enumerate(keys):
+            series = df.iloc[:, position]
+            hashes[key] = hash_column(series) if given_hashes is None else given_hashes[position]
+            if self._hashes.get(key) == hashes[key] and key in self._column_issues:
+                continue
+            self.dirty.append(key[0])
+            column_df = df.iloc[:, [position]]
+            # every copy of a required column is checked, as check_required_columns does
+            self._empty_issues[key] = _empty_cell_issues(series, key[0]) if key[0] in self.required else []
+            self._column_issues[key] = [check_rule(column_df, rule, self.vocabularies) for rule in self.column_rules]
+        for key in set(self._column_issues) - set(hashes):
+            del self._column_issues[key]
+            del self._empty_issues[key]
+        self._hashes = hashes
+
+        issues = []
+        for column in self.required:
+            if column not in df.columns:
+                issues.append(ValidationIssue(None, column, None, f"The required column {column} is missing", "error"))
+            for key in keys:
+                if key[0] == column:
+                    issues.extend(self._empty_issues[key])
+        column_rule = 0
+        for number, rule in enumerate(self.rules):
+            if rule.kind in ("vocabulary", "ontology", "format"):
+                for key in keys:
+                    issues.extend(self._column_issues[key][column_rule])
+                column_rule += 1
+                continue
+            # every copy of the columns of the rule, a sorted SDRF can hold several columns with the same name
+            rule_hashes = tuple((key, hashes[key]) for key in keys if key[0] in rule.columns)
+            cached = self._row_rule_issues.get(number)
+            if cached is None or cached[0] != rule_hashes:
+                cached = (rule_hashes, check_rule(df, rule, self.vocabularies))
+                self._row_rule_issues[number] = cached
+            issues.extend(cached[1])
+        is_valid = not any(issue.level == "error" for issue in issues)
+        self.result = ValidationResult(is_valid, "\n".join(format_issue(issue) for issue in issues), issues)
+        return self.result
+
+
+# batch validation of SDRF files outside of the app, see the command line at the end of this module
+
+# ontology store of a worker process of validate_files, opened once per process
+_worker_store = None
+
+
+def sdrf_paths(patterns):
+    """Returns the SDRF files given as paths, directories (all *.sdrf.tsv files below them) or glob patterns, sorted and without
+    duplicates"""
+    import glob
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.update(glob.glob(os.path.join(pattern, "**", "*.sdrf.tsv"), recursive=True))
+        else:
+            paths.update(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    return sorted(paths)
+
+
+def _init_worker(data_folder):
+    """Opens the ontology store of a worker process and loads the ontologies of the rule table"""
+    global _worker_store
+    from OntologyStore import OntologyStore, category_from_key
+    _worker_store = OntologyStore(data_folder)
+    keys = {key for rule in RULES if rule.kind == "ontology" for key in rule.argument}
+    _worker_store.preload(sorted({category_from_key(key) for key in keys if key in _worker_store}))
+
+
+def validate_file(path, template="default"):
+    """Reads and validates one SDRF file with the native engine and the ontology store of the process.
+    Returns a summary dict: the file, its size, the number of errors and warnings, the issues and the time it took"""
+    start = time.perf_counter()
+    summary = {"file": path, "is_valid": None, "rows": None, "columns": None, "errors": None, "warnings": None, "issues": []}
+    try:
+        df = pd.read_csv(path, sep="\t", dtype=str)
+        result = validate_native(df, template, _worker_store)
+        summary.update(
+            is_valid=result.is_valid,
+            rows=df.shape[0],
+            columns=df.shape[1],
+            errors=sum(issue.level == "error" for issue in result.issues),
+            warnings=sum(issue.level == "warning" for issue in result.issues),
+            issues=[
+                {"row": issue.row, "column": issue.column, "value": issue.value, "message": issue.message,
+                 "level": issue.level, "rows": issue.rows}
+                for issue in result.issues
+            ],
+        )
+    except Exception as error:
+        summary["message"] = f"{type(error).__name__}: {error}"
+    summary["seconds"] = round(time.perf_counter() - start, 4)
+    return summary
+
+
+def validate_files(paths, template="default", data_folder=None, workers=None):
+    """Validates SDRF files in parallel on a pool of processes, each opening the ontology store once.
+    Returns the summaries of the files (see validate_file) in the order of paths"""
+    from concurrent.futures import ProcessPoolExecutor
+    if data_folder is None:
+        data_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+    workers = min(workers or os.cpu_count() or 1, max(len(paths), 1))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_folder,)) as pool:
+        return list(pool.map(validate_file, paths, [template] * len(paths), chunksize=max(1, len(paths) // (workers * 4))))
+
+
+SUMMARY_COLUMNS = ["file", "is_valid", "rows", "columns", "errors", "warnings", "seconds", "message"]
+
+
+def write_summary(summaries, output, seconds, workers):
+    """Writes the summaries as json (with the issues of every file) or, if output ends with .tsv, as one tsv line per file"""
+    import json
+    if output.endswith(".tsv"):
+        frame = pd.DataFrame(summaries).reindex(columns=SUMMARY_COLUMNS)
+        frame.to_csv(output, sep="\t", index=False)
+    else:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"workers": workers, "seconds": round(seconds, 4), "files": summaries}, f, indent=1, default=str)
+
+
+if __name__ == "__main__":
+    # python ValidationModule.py templates/ "submissions/**/*.sdrf.tsv" --output summary.json
+    import argparse
+    parser = argparse.ArgumentParser(description="Validates SDRF files with the native engine on a pool of processes")
+    parser.add_argument("paths", nargs="+", help="SDRF files, directories or glob patterns")
+    parser.add_argument("--template", default="default", help="template whose required columns are checked")
+    parser.add_argument("--data", default=None, help="folder of the ontologies, by default data next to this module")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes, by default one per core")
+    parser.add_argument("--output", default="validation_summary.json", help="summary file, .json or .tsv")
+    args = parser.parse_args()
+
+    paths = sdrf_paths(args.paths)
+    if not paths:
+        sys.exit("No SDRF files found")
+    start = time.perf_counter()
+    summaries = validate_files(paths, args.template, args.data, args.workers)
+    seconds = time.perf_counter() - start
+    workers = min(args.workers or os.cpu_count() or 1, len(paths))
+    write_summary(summaries, args.output, seconds, workers)
+    invalid = [summary for summary in summaries if not summary["is_valid"]]
+    print(f"Validated {len(paths)} files on {workers} processes in {seconds:.1f} s, {len(invalid)} not valid, summary in {args.output}")
+    sys.exit(1 if invalid else 0)
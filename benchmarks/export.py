@@ -0,0 +1,64 @@
+"""Timing and peak memory of the SDRF export of the sidebar download.
+
+Repeats an SDRF file until it has the asked number of rows (50000 by default), then exports it like the app does: sorting
+and stripping the columns (ParsingModule.sort_sdrf_columns) and writing the tsv (ParsingModule.write_sdrf).
+The same sorted dataframe written with pandas' to_csv is timed as reference.
+
+    python benchmarks/export.py                                       # templates/PXD000548.sdrf.tsv
+    python benchmarks/export.py my.sdrf.tsv --rows 100000
+"""
+import io
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import pandas as pd
+
+import ParsingModule
+
+
+def export(df):
+    return ParsingModule.write_sdrf(ParsingModule.sort_sdrf_columns(df), io.BytesIO()).getvalue()
+
+
+def export_with_pandas(df):
+    return ParsingModule.sort_sdrf_columns(df).to_csv(index=False, sep="\t").encode("utf-8")
+
+
+def measure(function, df):
+    """Returns the seconds and the peak of the traced memory in bytes of function(df), and its result"""
+    start = time.perf_counter()
+    result = function(df)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    function(df)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?", default=os.path.join(REPO_DIR, "templates", "PXD000548.sdrf.tsv"))
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    sdrf = pd.read_csv(args.file, sep="\t", dtype=str)
+    df = pd.concat([sdrf] * (args.rows // len(sdrf) + 1), ignore_index=True).iloc[: args.rows]
+    print(f"{os.path.basename(args.file)} repeated to {df.shape[0]} rows and {df.shape[1]} columns")
+    results = {}
+    for name, function in [("write_sdrf", export), ("to_csv", export_with_pandas)]:
+        seconds, peak, results[name] = measure(function, df)
+        print(f"{name:<12}{seconds:>8.3f} s{peak / 2**20:>8.1f} MB peak{len(results[name]) / 2**20:>8.1f} MB file")
+    if results["write_sdrf"] != results["to_csv"]:
+        print("The exported files differ")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
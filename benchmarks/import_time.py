@@ -0,0 +1,65 @@
+"""Import-time report for the modules the app imports on every page.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and sums the self time of every imported module
+per top-level package, so a new heavy import at module level shows up as a regression.
+
+    python benchmarks/import_time.py                       # report for ParsingModule
+    python benchmarks/import_time.py OntologyStore --top 10
+    python benchmarks/import_time.py --max-ms 1500         # exit with status 1 if importing takes longer
+"""
+import os
+import re
+import sys
+import argparse
+import subprocess
+from collections import defaultdict
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_times(module):
+    """Returns (package, self microseconds, number of modules) per top-level package and the cumulative import time of module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    per_package = defaultdict(lambda: [0, 0])
+    total = 0
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        package = name.split(".")[0]
+        per_package[package][0] += self_us
+        per_package[package][1] += 1
+        if name == module and len(indent) == 1:
+            total = cumulative_us
+    rows = sorted(((package, us, count) for package, (us, count) in per_package.items()), key=lambda row: -row[1])
+    return rows, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("module", nargs="?", default="ParsingModule")
+    parser.add_argument("--top", type=int, default=20, help="number of packages to show")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if the cumulative import time exceeds this")
+    args = parser.parse_args()
+
+    rows, total = import_times(args.module)
+    print(f"{'package':<30}{'self ms':>10}{'modules':>10}")
+    for package, us, count in rows[: args.top]:
+        print(f"{package:<30}{us / 1000:>10.1f}{count:>10}")
+    print(f"\nimport {args.module}: {total / 1000:.1f} ms cumulative")
+    if args.max_ms is not None and total / 1000 > args.max_ms:
+        print(f"Import time exceeds the limit of {args.max_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Timing of the label expansion of the Labeling page.
+
+Builds an SDRF with one row per raw file (the columns of an SDRF file, 28 for PXD000548) and gives every file all channels
+of a TMT-like plex, as the page does when every file is selected for every label. Then expands it with
+ParsingModule.expand_labels and, as reference, with the loop the page used before (a copy of the rows of every file for every
+label, concatenated and sorted on the data file).
+
+    python benchmarks/labeling.py                                     # 10, 100 and 1000 files x 6, 11 and 18 channels
+    python benchmarks/labeling.py --files 1000 --channels 16 18 --no-loop
+"""
+import os
+import sys
+import time
+import argparse
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import pandas as pd
+
+import ParsingModule
+
+
+def expand_with_loop(template_df, label_dict):
+    new_rows = []
+    for filename, label_list in label_dict.items():
+        if filename == "ALL":
+            rows_to_add = template_df.copy()
+        else:
+            rows_to_add = template_df[template_df["comment[data file]"] == filename]
+        for label in label_list:
+            new_row = rows_to_add.copy()
+            new_row["comment[label]"] = label
+            new_rows.append(new_row)
+    return pd.concat(new_rows, ignore_index=True).sort_values(by="comment[data file]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?", default=os.path.join(REPO_DIR, "templates", "PXD000548.sdrf.tsv"))
+    parser.add_argument("--files", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--channels", type=int, nargs="+", default=[6, 11, 18])
+    parser.add_argument("--no-loop", action="store_true", help="only time expand_labels")
+    args = parser.parse_args()
+
+    sdrf = ParsingModule.read_sdrf(args.file)
+    print(f"{'files':>8}{'channels':>10}{'rows':>10}{'expand_labels ms':>18}{'loop ms':>12}")
+    for files in args.files:
+        template_df = pd.concat([sdrf] * (files // len(sdrf) + 1), ignore_index=True).iloc[:files].copy()
+        template_df["comment[data file]"] = [f"run_{i:05d}.raw" for i in range(files)]
+        for channels in args.channels:
+            labels = [f"TMT{126 + i}" for i in range(channels)]
+            label_dict = {filename: labels for filename in template_df["comment[data file]"]}
+            start = time.perf_counter()
+            expanded = ParsingModule.expand_labels(template_df, label_dict)
+            vectorised = (time.perf_counter() - start) * 1000
+            loop = ""
+            if not args.no_loop:
+                start = time.perf_counter()
+                reference = expand_with_loop(template_df, label_dict)
+                loop = f"{(time.perf_counter() - start) * 1000:.1f}"
+                # the files are numbered in order, so sorting on the data file keeps the order of the rows
+                same = reference.reset_index(drop=True)[expanded.columns].equals(expanded)
+                loop += "" if same else " (differs)"
+            print(f"{files:>8}{channels:>10}{expanded.shape[0]:>10}{vectorised:>18.1f}{loop:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Server time of one rerun of a page for growing SDRF files, with and without the large SDRF mode.
+
+Repeats an SDRF file to each of the asked numbers of rows and times the work a rerun does with the dataframe:
+showing it (the whole frame as st.write did, or one page as ParsingModule.sdrf_preview does, serialised to arrow like
+streamlit does), sending it to an editable grid (the whole frame, or the data file and edited column of a large SDRF, as json
+like st_aggrid does), filling a column by data file pattern (ParsingModule.fill_column), hashing it for the sidebar download
+and re-validating it after one column changed (ValidationModule.IncrementalValidator with the ontology store of the data
+folder, so the ontology columns are checked against their terms as in the app).
+
+    python benchmarks/large_sdrf.py                                   # 500, 5000 and 50000 rows
+    python benchmarks/large_sdrf.py --rows 1000 10000 100000
+"""
+import os
+import sys
+import time
+import argparse
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import pandas as pd
+import pyarrow as pa
+
+import ParsingModule
+import ValidationModule
+from OntologyStore import OntologyStore
+
+
+def arrow_bytes(df):
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(df)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+def grid_json(df):
+    return df.to_json(orient="records")
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?", default=os.path.join(REPO_DIR, "templates", "PXD000548.sdrf.tsv"))
+    parser.add_argument("--rows", type=int, nargs="+", default=[500, 5000, 50000])
+    parser.add_argument("--column", default="characteristics[disease]", help="the column that is edited")
+    args = parser.parse_args()
+
+    sdrf = ParsingModule.read_sdrf(args.file)
+    store = OntologyStore(os.path.join(REPO_DIR, "data"))
+    header = ["rows", "full view", "page view", "full grid", "column grid", "fill", "hash", "re-validate"]
+    print("".join(f"{name:>13}" for name in header) + "   (ms)")
+    for rows in args.rows:
+        df = pd.concat([sdrf] * (rows // len(sdrf) + 1), ignore_index=True).iloc[:rows].copy()
+        df["comment[data file]"] = df["comment[data file]"] + "_" + df.index.astype(str)
+        page = df.iloc[: ParsingModule.PREVIEW_PAGE_SIZE]
+        scoped = df[["comment[data file]", args.column]]
+        validator = ValidationModule.IncrementalValidator("default", store)
+        validator.validate(df)
+        edited = df.copy()
+        ParsingModule.fill_column(edited, args.column, "not available", pattern="Slice0[1-5]")
+        times = [
+            timed(arrow_bytes, df),
+            timed(arrow_bytes, page),
+            timed(grid_json, df),
+            timed(grid_json, scoped),
+            timed(ParsingModule.fill_column, df.copy(), args.column, "not available", "Slice0[1-5]"),
+            timed(ValidationModule.hash_df, df),
+            timed(validator.validate, edited),
+        ]
+        print(f"{rows:>13}" + "".join(f"{ms:>13.1f}" for ms in times))
+
+
+if __name__ == "__main__":
+    main()
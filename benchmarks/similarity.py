@@ -0,0 +1,58 @@
+"""Timing of the n-gram term suggestions of the Mapping local metadata page.
+
+Builds the similarity index over an ontology of the data folder, then asks suggestions for a column of misspelled
+terms (500 rows with 50 distinct values by default), like the page does for values that are not ontology terms.
+
+    python benchmarks/similarity.py                                   # all_disease_elements
+    python benchmarks/similarity.py all_cell_elements --rows 5000 --distinct 500
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from OntologyStore import OntologyStore
+from SearchModule import NgramIndex
+
+
+def misspell(term, rng):
+    """Returns the term in upper case with one character dropped, as local metadata often has it"""
+    position = rng.randrange(len(term))
+    return (term[:position] + term[position + 1:]).upper()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("key", nargs="?", default="all_disease_elements")
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--distinct", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    store = OntologyStore(os.path.join(REPO_DIR, "data"))
+    terms = store[args.key]
+    start = time.perf_counter()
+    index = NgramIndex(terms)
+    build = time.perf_counter() - start
+
+    rng = random.Random(args.seed)
+    originals = rng.sample(index.terms, args.distinct)
+    values = [misspell(term, rng) for term in originals]
+    column = [rng.choice(values) for _ in range(args.rows)]
+    start = time.perf_counter()
+    suggestions = index.suggest(column, k=args.k)
+    suggest = time.perf_counter() - start
+
+    found = sum(1 for term, value in zip(originals, values) if term in [t for t, _ in suggestions[value]])
+    print(f"{args.key}: {len(index)} distinct terms, index built in {build:.3f} s")
+    print(f"{args.rows} rows with {args.distinct} distinct values: suggestions in {suggest * 1000:.1f} ms")
+    print(f"original term among the top {args.k} suggestions for {found}/{args.distinct} values")
+
+
+if __name__ == "__main__":
+    main()
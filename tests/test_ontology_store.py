@@ -0,0 +1,65 @@
+import os
+import sys
+import gzip
+import json
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from OntologyBundle import build_bundle, tree_to_nodes
+from OntologyStore import OntologyStore
+from SearchModule import NodeTable
+
+
+def write_gzipped_json(path, data):
+    path.write_bytes(gzip.compress(json.dumps(data).encode("utf-8"), mtime=0))
+
+
+def test_bundle_is_not_used_for_a_changed_file_of_the_same_size(tmp_path):
+    path = tmp_path / "all_label_elements.json.gz"
+    write_gzipped_json(path, ["TMT126", "TMT127"])
+    build_bundle(str(tmp_path))
+    store = OntologyStore(str(tmp_path))
+    assert list(store["all_label_elements"]) == ["TMT126", "TMT127"]
+    assert store.file_report()[0]["source"] == "bundle"
+
+    write_gzipped_json(path, ["TMT126", "TMT128"])
+    assert os.path.getsize(path) == store.bundle.source_bytes("all_label_elements")
+    changed = OntologyStore(str(tmp_path))
+    assert list(changed["all_label_elements"]) == ["TMT126", "TMT128"]
+    assert changed.file_report()[0]["source"] == "json"
+    assert changed.version != store.version
+
+
+def test_node_table_is_built_from_the_tree(tmp_path):
+    tree = {"disease": {"cancer": {"carcinoma": {}, "sarcoma": {}}, "infection": {}}}
+    write_gzipped_json(tmp_path / "disease_dict.json.gz", tree)
+    write_gzipped_json(tmp_path / "disease_nodes.json.gz", tree_to_nodes(tree))
+    store = OntologyStore(str(tmp_path))
+    table = store.node_table("disease_nodes")
+    reference = NodeTable(tree_to_nodes(tree))
+    assert (table.labels, table.children, table.roots) == (reference.labels, reference.children, reference.roots)
+    assert store.node_table("disease_nodes") is table
+    assert not any(key.endswith("_nodes") for key in store._data)
+
+
+def test_synonyms_are_loaded_when_first_asked_for(tmp_path):
+    write_gzipped_json(tmp_path / "disease_dict.json.gz", {"disease": {"influenza": {}}})
+    write_gzipped_json(tmp_path / "disease_synonyms.json.gz", {"flu": "influenza"})
+    store = OntologyStore(str(tmp_path))
+    store.load_category("disease")
+    assert store.is_loaded("disease") and "disease_synonyms" not in store._data
+    assert store["disease_synonyms"]["flu"] == "influenza"
+    assert [entry["key"] for entry in store.file_report()] == ["disease_dict", "disease_synonyms"]
+
+
+def test_synonym_indexes_are_stored_as_the_same_bytes(tmp_path):
+    import BuildModule
+    write_gzipped_json(tmp_path / "all_organism_elements.json.gz", ["Homo sapiens", "Mus musculus"])
+    synonyms_path = tmp_path / "organism_synonyms.json.gz"
+    BuildModule.store_synonym_indexes(str(tmp_path), str(tmp_path / "ontology"))
+    first = synonyms_path.read_bytes()
+    BuildModule.store_synonym_indexes(str(tmp_path), str(tmp_path / "ontology"))
+    assert synonyms_path.read_bytes() == first
+    assert first[4:8] == b"\0\0\0\0"
+    assert json.loads(gzip.decompress(first))["human"] == "Homo sapiens"
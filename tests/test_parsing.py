@@ -0,0 +1,98 @@
+import io
+import os
+import sys
+
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import ParsingModule
+
+EXAMPLE_SDRF = os.path.join(REPO_DIR, "templates", "PXD000548.sdrf.tsv")
+
+
+def test_incremental_writer_only_converts_changed_columns(monkeypatch):
+    df = ParsingModule.sort_sdrf_columns(ParsingModule.read_sdrf(EXAMPLE_SDRF))
+    converted = []
+    tsv_column = ParsingModule.tsv_column
+    monkeypatch.setattr(ParsingModule, "tsv_column", lambda series: converted.append(series.name) or tsv_column(series))
+    writer = ParsingModule.IncrementalWriter()
+    first = writer.write(df, io.BytesIO()).getvalue()
+    assert first == df.to_csv(index=False, sep="\t").encode("utf-8")
+
+    converted.clear()
+    df.iloc[0, 1] = "Mus musculus"
+    second = writer.write(df, io.BytesIO()).getvalue()
+    assert second == df.to_csv(index=False, sep="\t").encode("utf-8")
+    assert converted == [df.columns[1]]
+
+
+def test_check_df_for_ontology_terms_reports_unknown_values_with_their_rows():
+    df = pd.DataFrame({
+        "characteristics[disease]": ["normal", "flu", "normal", "not available", "flu"],
+        "characteristics[sex]": ["M", "F", "X", "F", None],
+        "characteristics[age]": ["12Y", "3 years", "48Y-84Y", "12Y", "12Y"],
+        "comment[data file]": ["a.raw", "b.raw", "c.raw", "d.raw", "e.raw"],
+    })
+    vocabularies = {"all_disease_elements": ["normal", "influenza"]}
+    report = ParsingModule.check_df_for_ontology_terms(df, data_dict=vocabularies)
+    assert report.checked == ["characteristics[disease]", "characteristics[sex]", "characteristics[age]"]
+    assert report.unknown == {
+        "characteristics[disease]": {"flu": [1, 4]},
+        "characteristics[sex]": {"X": [2]},
+        "characteristics[age]": {"3 years": [1]},
+    }
+    only_sex = ParsingModule.check_df_for_ontology_terms(df, ["characteristics[sex]"], vocabularies)
+    assert only_sex.unknown == {"characteristics[sex]": {"X": [2]}}
+
+
+def test_propose_sdrf_column_from_the_cross_ontology_index(tmp_path):
+    from OntologyStore import OntologyStore
+    from test_ontology_store import write_gzipped_json
+    write_gzipped_json(tmp_path / "disease_dict.json.gz", {"disease": {"influenza": {}, "normal": {}}})
+    write_gzipped_json(tmp_path / "all_disease_elements.json.gz", ["disease", "influenza", "normal"])
+    write_gzipped_json(tmp_path / "disease_synonyms.json.gz", {"flu": "influenza"})
+    write_gzipped_json(tmp_path / "organism_part_dict.json.gz", {"anatomical entity": {"liver": {}, "normal": {}}})
+    write_gzipped_json(tmp_path / "all_organism_part_elements.json.gz", ["anatomical entity", "liver", "normal"])
+    store = OntologyStore(str(tmp_path))
+    columns = ["characteristics[organism part]", "characteristics[disease]"]
+    assert ParsingModule.propose_sdrf_column(pd.Series(["Flu", "normal", "influenza"]), columns, store) == (
+        "characteristics[disease]", "disease", 1.0,
+    )
+    assert ParsingModule.propose_sdrf_column(pd.Series(["liver", "heart", "lung"]), columns, store) is None
+    assert ParsingModule.propose_sdrf_column(pd.Series(["flu"]), ["characteristics[organism part]"], store) is None
+
+
+def test_write_sdrf_gives_the_bytes_of_to_csv():
+    df = ParsingModule.sort_sdrf_columns(ParsingModule.read_sdrf(EXAMPLE_SDRF))
+    df.iloc[0, 2] = 'a "quoted"\tvalue'
+    df.iloc[1, 2] = None
+    df.iloc[2, 2] = "two\nlines"
+    expected = df.to_csv(index=False, sep="\t").encode("utf-8")
+    assert ParsingModule.write_sdrf(df, io.BytesIO(), chunk_rows=7).getvalue() == expected
+
+    # one column files quote their empty cells, they are written by pandas
+    single = df.iloc[:, [2]]
+    assert ParsingModule.write_sdrf(single, io.BytesIO()).getvalue() == single.to_csv(index=False, sep="\t").encode("utf-8")
+    # cells holding lists can not be factorized, they are written by pandas
+    listed = pd.DataFrame({"source name": ["a", "b"], "comment[label]": [["TMT126"], ["TMT127"]]})
+    assert ParsingModule.write_sdrf(listed, io.BytesIO()).getvalue() == listed.to_csv(index=False, sep="\t").encode("utf-8")
+
+
+def test_expand_labels_repeats_every_row_once_per_label():
+    df = pd.DataFrame({
+        "source name": ["s1", "s2", "s3", "s4"],
+        "comment[data file]": ["a.raw", "b.raw", "a.raw", "c.raw"],
+        "comment[label]": [None, None, None, None],
+    })
+    expanded = ParsingModule.expand_labels(df, {"ALL": ["TMT126"], "a.raw": ["TMT127", "TMT126"], "b.raw": ["TMT128"]})
+    assert expanded["source name"].tolist() == ["s1", "s1", "s2", "s2", "s3", "s3", "s4"]
+    assert expanded["comment[label]"].tolist() == ["TMT126", "TMT127", "TMT126", "TMT128", "TMT126", "TMT127", "TMT126"]
+    assert list(expanded.index) == list(range(7))
+    assert df["comment[label]"].isna().all()
+
+    # rows of files without labels are left out
+    only_b = ParsingModule.expand_labels(df, {"b.raw": ["TMT128", "TMT129"]})
+    assert only_b[["source name", "comment[label]"]].values.tolist() == [["s2", "TMT128"], ["s2", "TMT129"]]
+    assert ParsingModule.expand_labels(df, {}).shape == (0, 3)
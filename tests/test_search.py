@@ -0,0 +1,122 @@
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import SearchModule
+
+SPECIES = [
+    "Homo sapiens",
+    "Homo sapiens neanderthalensis",
+    "Homo",
+    "Pan troglodytes",
+    "Mus musculus",
+    "Rattus norvegicus",
+    "Human immunodeficiency virus 1",
+    "Usnea",
+]
+
+
+def test_term_index_ranks_exact_prefix_then_substring_matches():
+    index = SearchModule.TermIndex(SPECIES)
+    result = index.search("HOMO")
+    assert result.exact == "Homo"
+    assert result.matches == ["Homo", "Homo sapiens", "Homo sapiens neanderthalensis"]
+    assert not result.truncated
+
+    result = index.search("sapiens")
+    assert result.exact is None
+    assert result.matches == ["Homo sapiens", "Homo sapiens neanderthalensis"]
+
+    # prefix matches come before substring matches, substring matches by the position of the query
+    assert index.search("us").matches == ["Usnea", "Mus musculus", "Rattus norvegicus", "Human immunodeficiency virus 1"]
+
+
+def test_term_index_truncates_to_the_shortest_matches():
+    index = SearchModule.TermIndex(SPECIES)
+    result = index.search("homo", limit=2)
+    assert result.matches == ["Homo", "Homo sapiens"]
+    assert result.truncated
+    assert index.search("o", limit=3).truncated
+
+
+def test_term_index_ignores_empty_queries_and_separators():
+    index = SearchModule.TermIndex(SPECIES)
+    assert index.search("  ") == SearchModule.SearchResult(None, [], False)
+    assert index.search("Homo\nsapiens") == SearchModule.SearchResult(None, [], False)
+
+
+def test_index_for_is_built_once_per_list_object():
+    terms = tuple(SPECIES)
+    assert SearchModule.index_for(terms) is SearchModule.index_for(terms)
+    index = SearchModule.TermIndex(terms)
+    assert SearchModule.index_for(index) is index
+
+
+def test_char_ngrams_are_padded_and_case_folded():
+    assert SearchModule.char_ngrams("Ab") == {" ab", "ab "}
+    assert SearchModule.char_ngrams("A  b") == SearchModule.char_ngrams("a b")
+
+
+def test_ngram_index_suggests_the_closest_terms_first():
+    index = SearchModule.NgramIndex(["liver", "kidney", "heart", "left ventricle", "brain", 5])
+    assert len(index) == 5
+    suggestions = index.suggest(["livr", "Kidney ", "xyz", "livr"], k=2)
+    assert list(suggestions) == ["livr", "Kidney ", "xyz"]
+    assert suggestions["Kidney "] == [("kidney", 1.0)]
+    assert suggestions["livr"] == [("liver", 0.447)]
+    assert suggestions["xyz"] == []
+    assert index.suggest(["livr", "hart"], k=1, max_cells=1) == index.suggest(["livr", "hart"], k=1)
+    assert SearchModule.NgramIndex([]).suggest(["liver"]) == {"liver": []}
+
+
+# "liver" occurs twice, under "abdomen" and under "digestive system"
+ANATOMY = {
+    "anatomical entity": {
+        "abdomen": {"liver": {"hepatic lobule": {}}, "kidney": {}},
+        "digestive system": {"liver": {"hepatic lobule": {}}, "stomach": {}},
+    },
+    "cell": {},
+}
+
+
+def test_closure_index_answers_subsumption_over_all_occurrences():
+    index = SearchModule.ClosureIndex(ANATOMY)
+    assert len(index) == 10
+    assert "liver" in index and "heart" not in index
+    assert index.is_descendant("hepatic lobule", "anatomical entity")
+    assert index.is_descendant("liver", "digestive system")
+    assert index.is_descendant("liver", "abdomen")
+    assert not index.is_descendant("kidney", "digestive system")
+    assert not index.is_descendant("liver", "liver")
+    assert not index.is_descendant("heart", "anatomical entity")
+
+
+def test_closure_index_ancestors_subtree_size_and_descendants():
+    index = SearchModule.ClosureIndex(ANATOMY)
+    assert index.ancestors("hepatic lobule")[0] == "liver"
+    assert set(index.ancestors("liver")) == {"abdomen", "digestive system", "anatomical entity"}
+    assert index.ancestors("liver")[-1] == "anatomical entity"
+    assert index.ancestors("cell") == []
+    assert index.subtree_size("anatomical entity") == 8
+    assert index.subtree_size("liver") == 1
+    assert index.subtree_size("kidney") == 0
+    assert index.subtree_size("heart") == 0
+    assert index.descendants("digestive system") == {"liver", "hepatic lobule", "stomach"}
+    assert index.descendant_mask(["stomach", "kidney", "heart"], "digestive system").tolist() == [True, False, False]
+
+
+def test_category_index_finds_the_categories_of_folded_terms():
+    index = SearchModule.CategoryIndex({
+        "disease": ["Influenza", "normal", "flu"],
+        "organism_part": ["liver", "normal"],
+    })
+    assert len(index) == 4
+    assert index.categories_of("  INFLUENZA ") == ["disease"]
+    assert index.categories_of("normal") == ["disease", "organism_part"]
+    assert index.categories_of("heart") == []
+    coverage = index.coverage(["flu", "Liver", "normal", "normal", "", None, "heart"])
+    assert coverage == [("disease", 0.5), ("organism_part", 0.5)]
+    assert index.coverage(["liver", "LIVER", "normal"]) == [("organism_part", 1.0), ("disease", 0.5)]
+    assert index.coverage(["", None]) == []
@@ -0,0 +1,126 @@
+import os
+import sys
+
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import ValidationModule
+
+EXAMPLE_SDRF = os.path.join(REPO_DIR, "templates", "PXD000548.sdrf.tsv")
+
+
+def example_with_duplicate_organism():
+    """PXD000548 with a second characteristics[organism] column, as sort_sdrf_columns makes of characteristics[organism]_1"""
+    df = pd.read_csv(EXAMPLE_SDRF, sep="\t")
+    second = df[["characteristics[organism]"]].copy()
+    second.iloc[0, 0] = "Mus musculus"
+    return pd.concat([df, second], axis=1)
+
+
+def test_validate_native_with_duplicate_column_names():
+    df = example_with_duplicate_organism()
+    assert list(df.columns).count("characteristics[organism]") == 2
+    result = ValidationModule.validate_native(df, "human")
+    inconsistent = [
+        issue for issue in result.issues
+        if issue.column == "characteristics[organism]" and issue.message.startswith("one source name")
+    ]
+    assert [issue.value for issue in inconsistent] == ["Sample 1"]
+
+
+def test_required_columns_with_duplicate_column_names():
+    df = example_with_duplicate_organism()
+    df.iloc[3, -1] = None
+    issues = ValidationModule.check_required_columns(df, "human")
+    assert [(issue.column, issue.rows) for issue in issues] == [("characteristics[organism]", [3])]
+
+
+def test_incremental_validation_after_sort_sdrf_columns():
+    import ParsingModule
+    df = pd.read_csv(EXAMPLE_SDRF, sep="\t")
+    df["characteristics[organism]_1"] = df["characteristics[organism]"]
+    validator = ValidationModule.IncrementalValidator("human")
+    first = validator.validate(ParsingModule.sort_sdrf_columns(df))
+    assert first.issues == ValidationModule.validate_native(ParsingModule.sort_sdrf_columns(df), "human").issues
+
+    # only the second organism column changes, the consistent rule has to see it
+    df.loc[0, "characteristics[organism]_1"] = "Mus musculus"
+    sorted_df = ParsingModule.sort_sdrf_columns(df)
+    second = validator.validate(sorted_df)
+    assert validator.dirty == ["characteristics[organism]"]
+    assert second.issues == ValidationModule.validate_native(sorted_df, "human").issues
+    assert any(issue.column == "characteristics[organism]" and issue.value == "Sample 1" for issue in second.issues)
+
+
+def test_incremental_validation_checks_every_copy_of_a_required_column():
+    df = example_with_duplicate_organism()
+    validator = ValidationModule.IncrementalValidator("human")
+    validator.validate(df)
+    df.iloc[2, -1] = None
+    result = validator.validate(df)
+    native = ValidationModule.validate_native(df, "human")
+    assert result.issues == native.issues
+    assert result.message == native.message
+    empty = [issue for issue in result.issues if issue.message.startswith("is empty")]
+    assert [(issue.column, issue.rows) for issue in empty] == [("characteristics[organism]", [2])]
+
+
+AGES = pd.Series(
+    ["12Y", "1Y 6M", "48Y-84Y", "3 years", None, "not available", "12Y/13Y", "3 years", "40D"],
+    index=list("abcdefghi"),
+)
+
+
+def test_check_ages_reports_wrong_values_with_their_rows():
+    check = ValidationModule.check_ages(AGES)
+    assert check == ValidationModule.AgeCheck(False, ["3 years"], ["d", "h"])
+    assert ValidationModule.check_ages(AGES.drop(["d", "h"])).is_valid
+    assert ValidationModule.check_ages(pd.Series([], dtype=object)).is_valid
+
+
+def test_parse_ages_gives_day_spans():
+    assert ValidationModule.parse_age("1Y 6M") == (545, 545)
+    assert ValidationModule.parse_age("48Y-84Y") == (17520, 30660)
+    assert ValidationModule.parse_age("3 years") is None
+    spans = ValidationModule.parse_ages(AGES)
+    assert list(spans.index) == list(AGES.index)
+    assert spans.loc["c"].tolist() == [17520.0, 30660.0]
+    assert spans.loc["g"].tolist() == [4380.0, 4745.0]
+    assert spans.loc["i"].tolist() == [40.0, 40.0]
+    assert spans.loc[["d", "e", "f", "h"]].isna().all().all()
+
+
+def test_validation_cache_evicts_the_least_recently_used_entry_by_count():
+    cache = ValidationModule.ValidationCache(max_entries=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.put("c", b"3")
+    assert "b" not in cache and "a" in cache and "c" in cache
+    assert [entry["key"] for entry in cache.entries()] == ["a", "c"]
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["hit_rate"]) == (1, 1, 1, 0.5)
+
+
+def test_validation_cache_evicts_by_bytes_and_skips_oversized_results():
+    size = ValidationModule.result_size(b"x" * 1000)
+    cache = ValidationModule.ValidationCache(max_bytes=2 * size)
+    cache.put("a", b"x" * 1000)
+    cache.put("b", b"y" * 1000)
+    cache.put("c", b"z" * 1000)
+    assert [entry["key"] for entry in cache.entries()] == ["b", "c"]
+    assert cache.stats()["bytes"] == 2 * size
+    cache.put("big", b"x" * 3000)
+    assert "big" not in cache and len(cache) == 2
+
+
+def test_validation_cache_computes_a_missing_value_once():
+    cache = ValidationModule.ValidationCache()
+    calls = []
+    compute = lambda value: calls.append(value) or value
+    assert cache.get_or_compute("key", compute, "result") == "result"
+    assert cache.get_or_compute("key", compute, "other") == "result"
+    assert calls == ["result"]